@@ -0,0 +1,111 @@
+"""
+Compares the single-encode image job with the previous two-pass implementation.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_image.py [--runs 10] [--size 2560x1920] [--image photo.jpg]
+
+Without --image a synthetic photo (color gradients and blurred noise) is
+generated. Both variants run in this process on one core with the same
+parameters: crop, brightness, contrast, rotation, blur and metadata replace.
+
+The pixel difference depends on the input: most of it comes from the extra
+encode at the default JPEG quality in the previous implementation.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from typing import Dict
+
+from PIL import Image, ImageEnhance, ImageFilter, ImageChops, ImageStat
+import piexif
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.unique.image import _unique_image_job  # noqa: E402
+
+PARAMS = {
+    "crop": 3,
+    "brightness": 1.04,
+    "contrast": 1.05,
+    "angle": 0.2,
+    "blur": True,
+    "metadata_mode": "replace",
+    "metadata": {"Make": "Canon", "Model": "Canon Model-123", "SerialNumber": "ABCDEF123456"},
+    "strategy": "pixel",
+}
+
+
+def make_photo(path: str, width: int, height: int) -> None:
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40).filter(ImageFilter.GaussianBlur(3))
+    image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    image.save(path, "jpeg", quality=90)
+
+
+def previous_job(image_path: str, output_path: str, params: Dict) -> str:
+    """The implementation before the change: two enhance passes and a second encode for EXIF."""
+    image = Image.open(image_path)
+    width, height = image.size
+    crop = params["crop"]
+    image = image.crop((crop, crop, width - crop, height - crop))
+    image = ImageEnhance.Brightness(image).enhance(params["brightness"])
+    image = ImageEnhance.Contrast(image).enhance(params["contrast"])
+    if params["angle"]:
+        image = image.rotate(params["angle"])
+    if params["blur"]:
+        image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
+    image.save(output_path)
+
+    exif = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+    exif["0th"][piexif.ImageIFD.Make] = params["metadata"]["Make"].encode()
+    exif["0th"][piexif.ImageIFD.Model] = params["metadata"]["Model"].encode()
+    exif["Exif"][piexif.ExifIFD.BodySerialNumber] = params["metadata"]["SerialNumber"].encode()
+    Image.open(output_path).save(output_path, "jpeg", exif=piexif.dump(exif), quality=95)
+    return output_path
+
+
+def measure(job, runs: int) -> float:
+    job()
+    started = time.perf_counter()
+    for _ in range(runs):
+        job()
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--size", default="2560x1920")
+    parser.add_argument("--image", help="JPEG to use instead of the synthetic photo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = args.image
+        if not source:
+            width, height = (int(value) for value in args.size.split("x"))
+            source = os.path.join(directory, "source.jpg")
+            make_photo(source, width, height)
+        old_path = os.path.join(directory, "old.jpg")
+        new_path = os.path.join(directory, "new.jpg")
+
+        old_ms = measure(lambda: previous_job(source, old_path, PARAMS), args.runs)
+        new_ms = measure(lambda: _unique_image_job(source, [(new_path, PARAMS)]), args.runs)
+
+        with open(new_path, "rb") as f:
+            new_image = Image.open(io.BytesIO(f.read())).convert("RGB")
+        old_image = Image.open(old_path).convert("RGB")
+        difference = sum(ImageStat.Stat(ImageChops.difference(old_image, new_image)).mean) / 3
+        width, height = Image.open(source).size
+
+    print(f"Image: {width}x{height}, runs: {args.runs}")
+    print(f"previous: {old_ms:.0f} ms per image")
+    print(f"current:  {new_ms:.0f} ms per image ({old_ms / new_ms:.2f}x)")
+    print(f"mean absolute pixel difference: {difference:.2f}/255")
+
+
+if __name__ == "__main__":
+    main()
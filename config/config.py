@@ -1,6 +1,6 @@
 import sys
 import yaml
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 from rich.text import Text
 from rich.panel import Panel
 from pydantic import BaseModel, Field
@@ -22,11 +22,54 @@ class TelegramSettings(BaseModel):
     proxy: ProxySettings
 
 
+class PipelineSettings(BaseModel):
+    extract_workers: int = Field(default=2, ge=1, description="Воркеров скачивания")
+    uniquify_workers: int = Field(default=2, ge=1, description="Воркеров уникализации")
+    publish_workers: int = Field(default=1, ge=1, description="Воркеров публикации")
+    queue_size: int = Field(default=4, ge=1, description="Размер очереди между этапами")
+
+
+class PublishLimitSettings(BaseModel):
+    rate: float = Field(default=20, ge=0, description="Сообщений в минуту в один канал, 0 - без ограничения")
+    burst: int = Field(default=1, ge=1, description="Сообщений подряд без ожидания")
+
+
+class ScheduleSettings(BaseModel):
+    enabled: bool = Field(default=False, description="Публиковать историю отложенными сообщениями Telegram")
+    interval: Tuple[int, int] = Field(default=(600, 1800), description="Интервал между отложенными публикациями в канал в сек")
+    start_delay: int = Field(default=60, ge=10, description="Через сколько сек после запуска первая отложенная публикация")
+    limit: int = Field(default=100, ge=1, le=100, description="Максимум отложенных сообщений в канале (лимит Telegram - 100)")
+
+
+class MediaCacheSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Кешировать скачанные медиа и сконвертированное аудио")
+    directory: str = Field(default="data/media_cache", description="Папка кеша медиа")
+    max_size: float = Field(default=2048, ge=0, description="Максимальный размер кеша в МБ")
+
+
 class CloningSettings(BaseModel):
     mode: str = Field(default="history", description="Режим работы: history или live")
     posts_to_clone: int = Field(default=(20), description="Последних постов для клонирования")
+    posts_range: Optional[Tuple[int, int]] = Field(
+        default=None, description="Диапазон ID постов для клонирования (от, до), заменяет posts_to_clone"
+    )
     source_channels_file: str = Field(default="Источники.txt", description="Файл с каналами-донорами")
     target_channels_file: str = Field(default="Цели.txt", description="Файл с целевыми каналами")
+    memory_photo_limit: float = Field(default=5, ge=0, description="Фото до этого размера в МБ обрабатываются в памяти, 0 - всегда через диск")
+    pipeline: PipelineSettings = Field(default_factory=PipelineSettings, description="Настройки конвейера")
+    publish_limit: PublishLimitSettings = Field(
+        default_factory=PublishLimitSettings, description="Ограничение частоты публикаций в целевой канал"
+    )
+    target_limits: Dict[str, PublishLimitSettings] = Field(
+        default_factory=dict, description="Ограничения частоты публикаций для отдельных целевых каналов"
+    )
+    access_ttl: int = Field(default=3600, ge=0, description="Время в сек, на которое запоминается доступность канала")
+    ledger_file: str = Field(default="data/ledger.sqlite3", description="Журнал опубликованных постов, пусто - не вести")
+    schedule: ScheduleSettings = Field(default_factory=ScheduleSettings, description="Отложенные публикации в режиме history")
+    media_cache: MediaCacheSettings = Field(default_factory=MediaCacheSettings, description="Кеш медиа, общий для аккаунтов")
+    shared_sources: bool = Field(
+        default=True, description="В режиме live один аккаунт скачивает посты источника для всех аккаунтов"
+    )
 
 
 class TextUniquenessSettings(BaseModel):
@@ -37,20 +80,31 @@ class TextUniquenessSettings(BaseModel):
 
 
 class ImageUniquenessSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Уникализировать изображения, иначе пересылать оригинал по ссылке")
     crop: Tuple[int, int] = Field(default=(1, 4), description="Кадрирование в пикселях")
     brightness: Tuple[int, int] = Field(default=(1, 7), description="Изменение яркости в %")
     contrast: Tuple[int, int] = Field(default=(1, 7), description="Изменение контраста в %")
     rotation: bool = Field(default=True, description="Изменение градуса поворота")
     metadata: str = Field(default="replace", description="Удаление или замена метаданных")
     filters: bool = Field(default=True, description="Применение скрытых фильтров")
+    workers: int = Field(default=0, ge=0, description="Процессов обработки изображений, 0 - по числу ядер")
+    strategy: str = Field(default="pixel", description="pixel - обработка пикселей, lossless - JPEG без перекодирования")
 
 
 class VideoUniquenessSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Уникализировать видео, иначе пересылать оригинал по ссылке")
     hash_change: bool = Field(default=True, description="Изменение хеша видео")
     watermark: bool = Field(default=True, description="Добавление невидимых элементов")
     frame_rate_variation: bool = Field(default=True, description="Изменение FPS")
     audio_speed: Tuple[int, int] = Field(default=(2, 4), description="Изменение скорости аудио в %")
     metadata: str = Field(default="replace", description="Удаление или замена метаданных")
+    stream_copy: bool = Field(default=True, description="Не перекодировать совместимые с Telegram видео")
+    segment_threshold: int = Field(default=180, ge=0, description="Длительность в сек, с которой видео кодируется сегментами параллельно")
+
+
+class FFmpegSettings(BaseModel):
+    max_jobs: int = Field(default=0, ge=0, description="Одновременных задач ffmpeg, 0 - половина ядер процессора")
+    timeout: int = Field(default=600, ge=1, description="Таймаут одной задачи ffmpeg в сек")
 
 
 class UniquenessSettings(BaseModel):
@@ -59,10 +113,21 @@ class UniquenessSettings(BaseModel):
     video: VideoUniquenessSettings
 
 
+class PostRateSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Подстраивать задержку публикации под ограничения Telegram, иначе случайная задержка из post_delay")
+    min_delay: float = Field(default=2, ge=0, description="Минимальная задержка между публикациями в сек")
+    max_delay: float = Field(default=600, ge=0, description="Максимальная задержка между публикациями в сек")
+    step: float = Field(default=0.5, ge=0, description="На сколько сек уменьшать задержку после публикации без флуда")
+    backoff: float = Field(default=2, ge=1, description="Во сколько раз увеличивать задержку при флуде")
+    jitter: float = Field(default=0.3, ge=0, le=1, description="Случайное отклонение задержки (доля от текущей)")
+    state_file: str = Field(default="data/post_rates.json", description="Файл с выученными задержками")
+
+
 class TimeoutSettings(BaseModel):
     join_delay: Tuple[int, int] = Field(default=(5, 15), description="Задержка перед подпиской на канал")
     post_delay: Tuple[int, int] = Field(default=(5, 15), description="Задержка перед отправкой в сек")
     flood_wait_limit: int = Field(default=300, description="Максимальное время ожидания при флуд-ограничении")
+    post_rate: PostRateSettings = Field(default_factory=PostRateSettings, description="Адаптивная задержка публикации")
 
 
 class LoggingSettings(BaseModel):
@@ -77,6 +142,7 @@ class Config(BaseModel):
     uniqueness: UniquenessSettings
     timeouts: TimeoutSettings
     logging: LoggingSettings
+    ffmpeg: FFmpegSettings = Field(default_factory=FFmpegSettings)
 
 
 class ConfigManager:
@@ -111,11 +177,28 @@ def print_config(config: Config) -> None:
     config_text.append("  Режим работы: ", style="cyan")
     config_text.append(f"{config.cloning.mode}\n", style="green")
     config_text.append("  Диапазон постов: ", style="cyan")
-    config_text.append(f"{config.cloning.posts_to_clone}\n", style="green")
+    if config.cloning.posts_range:
+        config_text.append(f"{config.cloning.posts_range[0]} - {config.cloning.posts_range[1]}\n", style="green")
+    else:
+        config_text.append(f"последние {config.cloning.posts_to_clone}\n", style="green")
     config_text.append("  Источники каналов: ", style="cyan")
     config_text.append(f"{config.cloning.source_channels_file}\n", style="green")
     config_text.append("  Целевые каналы: ", style="cyan")
-    config_text.append(f"{config.cloning.target_channels_file}\n\n", style="green")
+    config_text.append(f"{config.cloning.target_channels_file}\n", style="green")
+    config_text.append("  Воркеры (скачивание/уникализация/публикация): ", style="cyan")
+    config_text.append(
+        f"{config.cloning.pipeline.extract_workers}/"
+        f"{config.cloning.pipeline.uniquify_workers}/"
+        f"{config.cloning.pipeline.publish_workers}\n",
+        style="green"
+    )
+    config_text.append("  Отложенные публикации: ", style="cyan")
+    if config.cloning.schedule.enabled:
+        config_text.append(
+            f"каждые {config.cloning.schedule.interval[0]} - {config.cloning.schedule.interval[1]} сек\n\n", style="green"
+        )
+    else:
+        config_text.append("Нет\n\n", style="green")
 
     config_text.append("Уникализация текста:\n", style="bold cyan")
     config_text.append("  Использовать рерайт: ", style="cyan")
@@ -126,6 +209,8 @@ def print_config(config: Config) -> None:
     config_text.append(f"{config.uniqueness.text.replacements_file}\n\n", style="green")
 
     config_text.append("Уникализация изображений:\n", style="bold cyan")
+    config_text.append("  Включена: ", style="cyan")
+    config_text.append(f"{'Да' if config.uniqueness.image.enabled else 'Нет (пересылка по ссылке)'}\n", style="green")
     config_text.append("  Кадрирование: ", style="cyan")
     config_text.append(f"{config.uniqueness.image.crop[0]} - {config.uniqueness.image.crop[1]} пикселей\n", style="green")
     config_text.append("  Яркость: ", style="cyan")
@@ -133,7 +218,11 @@ def print_config(config: Config) -> None:
     config_text.append("  Контраст: ", style="cyan")
     config_text.append(f"{config.uniqueness.image.contrast[0]} - {config.uniqueness.image.contrast[1]}%\n", style="green")
     config_text.append("  Изменение метаданных: ", style="cyan")
-    config_text.append(f"{config.uniqueness.image.metadata}\n", style="green")
+    config_text.append(f"{config.uniqueness.image.metadata}\n\n", style="green")
+
+    config_text.append("Уникализация видео:\n", style="bold cyan")
+    config_text.append("  Включена: ", style="cyan")
+    config_text.append(f"{'Да' if config.uniqueness.video.enabled else 'Нет (пересылка по ссылке)'}\n", style="green")
 
     config_text.append("\nНастройки логирования:\n", style="bold cyan")
     config_text.append("  Основной лог-файл: ", style="cyan")
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 from telethon import TelegramClient
 from telethon.errors import FloodWaitError
@@ -11,6 +12,7 @@ from src.managers import (
     JoinStatus, BlackList
 )
 from src.managers import ContentCloner
+from src.managers.clone import SourceHub
 from src.logger import logger, console
 
 
@@ -36,6 +38,7 @@ class Cloner(BaseThon):
         json_file: Path,
         json_data: dict,
         config: Config,
+        source_hub: Optional[SourceHub] = None,
     ):
         """
         Initializes the Chatter class with the necessary configurations and instances.
@@ -45,6 +48,7 @@ class Cloner(BaseThon):
             json_file (Path): The path to the JSON file containing account data.
             json_data (dict): The data loaded from the JSON file.
             config (Config): Configuration settings for the application.
+            source_hub (Optional[SourceHub]): Source subscriptions shared with other accounts.
         """
         super().__init__(
             item=item,
@@ -57,8 +61,9 @@ class Cloner(BaseThon):
         self.file_manager = FileManager()
         self.chat_joiner = ChatJoiner(config)
         self.account_phone = os.path.basename(self.item).split('.')[0]
+        self.client.request_scheduler.max_wait = config.timeouts.flood_wait_limit
         self.content_cloner = ContentCloner(
-            config, self.client, self.account_phone
+            config, self.client, self.account_phone, source_hub
         )
         self.source_channels = config.cloning.source_channels_file
         self.target_channels = config.cloning.target_channels_file
@@ -85,6 +90,7 @@ class Cloner(BaseThon):
         Joins the chats listed in the chats file, skipping blacklisted chats.
         """
         channels = self.file_manager.read_chats(file='Источники.txt')
+        await self.chat_joiner.load_memberships(self.client)
         for chat in channels:
             if self.blacklist.is_chat_blacklisted(
                 self.account_phone, chat
@@ -135,28 +141,12 @@ class Cloner(BaseThon):
                 )
                 self.blacklist.add_to_blacklist(account_phone, chat)
             case JoinStatus.FLOOD:
-                # mute_seconds = await self.check_flood_wait(client)
+                # Короткие ожидания уже выдержал планировщик запросов клиента,
+                # здесь только ограничения длиннее flood_wait_limit
                 console.print(
-                    f"{account_phone} | Флуд, приостанавливаем работу",
+                    f"{account_phone} | Флуд на вступление в {chat}, чат пропущен",
                     style="yellow"
                 )
-                return False
-                # if not mute_seconds:
-                #     return True
-                # flood_limit = self.config.timeouts.flood_wait_limit
-                # if mute_seconds:
-                #     if mute_seconds <= flood_limit:
-                #         console.print(
-                #             f"{account_phone} | Флуд {mute_seconds} секунд, делаем паузу...",
-                #             style="yellow"
-                #         )
-                #         await asyncio.sleep(mute_seconds)
-                #     else:
-                #         console.print(
-                #             f"{account_phone} | Флуд {mute_seconds} секунд, приостанавливаем работу",
-                #             style="yellow"
-                #         )
-                #         return False
             case JoinStatus.ALREADY_JOINED:
                 console.log(
                     f"Аккаунт {account_phone} уже состоит в чате {chat}",
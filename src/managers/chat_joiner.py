@@ -1,13 +1,15 @@
 import random
 import asyncio
 from enum import Enum
+from dataclasses import dataclass
+from typing import Any
 
-from telethon import TelegramClient
-from telethon.tl.types import Channel, Chat, ChatInviteAlready
+from telethon import TelegramClient, utils
+from telethon.tl.types import (
+    Channel, Chat, ChatInvite, ChatInviteAlready, ChatInvitePeek
+)
 from telethon.errors import (
-    UserNotParticipantError,
-    FloodWaitError,
-    ChatAdminRequiredError
+    FloodWaitError
 )
 from telethon.errors.rpcerrorlist import (
     InviteHashInvalidError,
@@ -31,6 +33,27 @@ class ChatType(Enum):
     UNKNOWN = "unknown"
 
 
+@dataclass
+class ChatInfo:
+    """
+    Result of resolving a chat once: everything the join branches need.
+
+    Attributes:
+        type: Channel or group, unknown if the chat is already joined and was not fetched.
+        private: The chat can only be joined by invite link or join request.
+        join_request: Joining requires admin approval.
+        member: The account is already a participant.
+        invite_hash: Invite hash if the chat was given by an invite link.
+        entity: Resolved Channel/Chat, if Telegram returned one.
+    """
+    type: "ChatType"
+    private: bool = False
+    join_request: bool = False
+    member: bool = False
+    invite_hash: str | None = None
+    entity: Any = None
+
+
 class JoinStatus(Enum):
     OK = "OK"
     SKIP = "SKIP"
@@ -58,6 +81,55 @@ class ChatJoiner:
             join_delay: A tuple (min_delay, max_delay) for random delay before joining.
         """
         self.config = config
+        self._member_ids: set[int] = set()
+        self._member_usernames: set[str] = set()
+        self._memberships_loaded = False
+
+    async def load_memberships(self, client: TelegramClient) -> bool:
+        """
+        Builds a membership index from the account's dialogs: one paginated
+        fetch instead of a check per chat. Chats found in it are reported as
+        ALREADY_JOINED by join() without any further requests.
+
+        Args:
+            client: The Telethon client instance.
+
+        Returns:
+            bool: True if the index was built.
+        """
+        ids, usernames = set(), set()
+        try:
+            async for dialog in client.iter_dialogs():
+                entity = dialog.entity
+                if not isinstance(entity, (Channel, Chat)):
+                    continue
+                ids.add(utils.get_peer_id(entity))
+                if getattr(entity, "username", None):
+                    usernames.add(entity.username.lower())
+                for username in getattr(entity, "usernames", None) or []:
+                    usernames.add(username.username.lower())
+        except Exception as e:
+            logger.error(f"Не удалось получить список диалогов: {e}")
+            return False
+        self._member_ids, self._member_usernames = ids, usernames
+        self._memberships_loaded = True
+        return True
+
+    def is_known_member(self, chat: str) -> bool:
+        """
+        Checks the membership index built by load_memberships. Invite links
+        cannot be matched without a request and always return False.
+
+        Args:
+            chat: Cleaned chat link, username or id.
+        """
+        if not self._memberships_loaded:
+            return False
+        if chat.lstrip("-").isdigit():
+            return int(chat) in self._member_ids
+        if "joinchat" in chat or chat.startswith("+") or "/" in chat:
+            return False
+        return chat.lstrip("@").lower() in self._member_usernames
 
     async def join(
         self,
@@ -77,92 +149,83 @@ class ChatJoiner:
             JoinStatus: The result of the operation.
         """
         chat = self.clean_chat_link(chat_link)
-        chat_type = await self.detect_chat(client, chat)
-        if chat_type == ChatType.UNKNOWN:
-            return JoinStatus.ERROR
-        elif isinstance(chat_type, JoinStatus):
-            return chat_type
-        user_in_chat = await self.is_member(client, chat)
-        if isinstance(user_in_chat, JoinStatus):
-            return user_in_chat
-        if user_in_chat:
+        if self.is_known_member(chat):
             return JoinStatus.ALREADY_JOINED
+        info = await self.resolve_chat(client, chat)
+        if isinstance(info, JoinStatus):
+            return info
+        if info.member:
+            return JoinStatus.ALREADY_JOINED
+        if info.type == ChatType.UNKNOWN:
+            return JoinStatus.ERROR
 
-        if chat_type == ChatType.CHANNEL:
-            return await self._join_channel(client, account_phone, chat)
-        elif chat_type == ChatType.GROUP:
-            return await self._join_group(client, account_phone, chat)
+        if info.type == ChatType.CHANNEL:
+            return await self._join_channel(client, account_phone, chat, info)
+        elif info.type == ChatType.GROUP:
+            return await self._join_group(client, account_phone, chat, info)
         return JoinStatus.SKIP
 
     async def _join_channel(
         self,
         client: TelegramClient,
         account_phone: str,
-        channel: str
+        channel: str,
+        info: ChatInfo
     ) -> JoinStatus:
         """
-        Joins a public channel.
+        Joins a channel.
 
         Args:
             channel: The channel username or link.
+            info: The resolved chat.
 
         Returns:
             JoinStatus: The result of the operation.
         """
-        is_private = await self.is_private_chat(
-            client, channel
-        )
-        if isinstance(is_private, JoinStatus):
-            return is_private
-        if is_private:
+        if info.invite_hash:
             return await self._join_private_channel(
-                client, account_phone, channel
+                client, account_phone, info.invite_hash
             )
         return await self._join_public_channel(
-            client, account_phone, channel
+            client, account_phone, info.entity or channel
         )
 
     async def _join_private_channel(
         self,
         client: TelegramClient,
         account_phone: str,
-        channel: str
+        invite_hash: str
     ) -> JoinStatus:
-        if "+" in channel:
-            channel = channel.split('+')[1]
-        if "joinchat" in channel:
-            channel = channel.split("/")[2]
         try:
             await self._random_delay()
-            await client(ImportChatInviteRequest(channel))
+            await client(ImportChatInviteRequest(invite_hash))
             return JoinStatus.OK
-        except FloodWaitError as e:
-            return JoinStatus.FLOOD, e.seconds
+        except FloodWaitError:
+            return JoinStatus.FLOOD
         except Exception as e:
             if "is not valid anymore" in str(e):
                 return JoinStatus.BANNED
-            elif "A wait of" in str(e):
-                return JoinStatus.FLOOD
             elif "is already" in str(e):
                 return JoinStatus.OK
             else:
-                logger.error(f"Error while trying to join channel {account_phone}, {channel}: {e}")
+                logger.error(f"Error while trying to join channel {account_phone}, {invite_hash}: {e}")
                 return JoinStatus.ERROR
 
     async def _join_public_channel(
             self,
             client: TelegramClient,
             account_phone: str,
-            channel: str
+            channel: str | Channel
     ) -> JoinStatus:
         try:
             await self._random_delay()
             await client(JoinChannelRequest(channel))
             return JoinStatus.OK
+        except FloodWaitError:
+            return JoinStatus.FLOOD
         except Exception as e:
-            if "A wait of" in str(e):
-                
-                return JoinStatus.FLOOD
+            if "successfully requested to join" in str(e):
+                return JoinStatus.REQUEST_SEND
             elif "is not valid" in str(e):
                 return JoinStatus.SKIP
             else:
@@ -173,7 +236,8 @@ class ChatJoiner:
         self,
         client: TelegramClient,
         account_phone: str,
-        group: str
+        group: str,
+        info: ChatInfo
     ) -> JoinStatus:
         """
         Joins a group with the specified account.
@@ -182,59 +246,52 @@ class ChatJoiner:
             client: The Telethon client.
             account_phone: The phone number of the account.
             group: The group to join.
+            info: The resolved chat.
 
         Returns:
             JoinStatus: The result of the operation.
         """
-        is_private = await self.is_private_chat(
-            client, group
-        )
-        if isinstance(is_private, JoinStatus):
-            return is_private
-        if is_private:
+        if info.invite_hash:
             return await self._join_private_group(
-                client, account_phone, group
+                client, account_phone, info.invite_hash
             )
         return await self._join_public_group(
-            client, account_phone, group
+            client, account_phone, info.entity or group
         )
 
     async def _join_private_group(
             self,
             client: TelegramClient,
             account_phone: str,
-            group: str
+            invite_hash: str
     ) -> JoinStatus:
-        if "+" in group:
-            group = group.split('+')[1]
         try:
             await self._random_delay()
-            await client(ImportChatInviteRequest(group))
+            await client(ImportChatInviteRequest(invite_hash))
             return JoinStatus.OK
+        except FloodWaitError:
+            return JoinStatus.FLOOD
         except Exception as e:
             if "is not valid anymore" in str(e):
                 return JoinStatus.SKIP
             elif "successfully requested to join" in str(e):
                 return JoinStatus.REQUEST_SEND
-            elif "A wait of" in str(e):
-                
-                return JoinStatus.FLOOD
             else:
-                logger.error(f"Error trying to join group {account_phone}, {group}: {e}")
+                logger.error(f"Error trying to join group {account_phone}, {invite_hash}: {e}")
                 return JoinStatus.ERROR
 
     async def _join_public_group(
             self,
             client: TelegramClient,
             account_phone: str,
-            group: str
+            group: str | Channel
     ) -> JoinStatus:
         try:
             await self._random_delay()
             await client(JoinChannelRequest(group))
             return JoinStatus.OK
-        except FloodWaitError as e:
-            return JoinStatus.FLOOD, e.seconds
+        except FloodWaitError:
+            return JoinStatus.FLOOD
         except Exception as e:
             if "successfully requested to join" in str(e):
                 return JoinStatus.REQUEST_SEND
@@ -244,80 +301,6 @@ class ChatJoiner:
                 logger.error(f"Error trying to join group {account_phone}, {group}: {e}")
                 return JoinStatus.ERROR
 
-    async def is_member(
-        self,
-        client: TelegramClient,
-        chat: str,
-    ) -> bool | JoinStatus:
-        """
-        Checks if the user is a member of the channel or group.
-
-        Args:
-            chat: The channel username or link.
-
-        Returns:
-            bool: True if the user is a member else False, or JoinStatus in case of error.
-        """
-        try:
-            chat_entity = await client.get_entity(chat)
-            await client.get_permissions(chat_entity, "me")
-            return True
-        except UserNotParticipantError:
-            return False
-        except InviteHashExpiredError:
-            return JoinStatus.SKIP
-        except Exception as e:
-            if "private and you lack permission" in str(e):
-                return JoinStatus.BANNED
-            elif "that you are not" in str(e):
-                return False
-            elif "A wait of" in str(e):
-                
-                return JoinStatus.FLOOD
-            logger.error(f"Error processing chat {chat}: {e}")
-            console.log(f"Ошибка при обработке чата {chat}: {e}", style="red")
-            return False
-
-    async def is_private_chat(
-        self,
-        client: TelegramClient,
-        chat: str,
-    ) -> bool | JoinStatus:
-        """
-        Checks if group or channel is private
-
-        Args:
-            client: TelegramClient.
-            group: Channel/group link, or username.
-
-        Returns:
-            bool: True, if group/channel is private, else False.
-        """
-        try:
-            entity = await client.get_entity(chat)
-            if isinstance(entity, Channel):
-                try:
-                    if entity.join_request:
-                        return True
-                    return not entity.username
-                except UserNotParticipantError:
-                    return True
-                except ChatAdminRequiredError:
-                    return True
-            return False
-        except InviteHashInvalidError:
-            return True
-        except ChatAdminRequiredError:
-            return True
-        except Exception as e:
-            if "you are not part of" in str(e):
-                return True
-            if "A wait of" in str(e):
-                return JoinStatus.FLOOD
-            logger.error(f"Error while trying to detect type of group/channel {chat}: {e}")
-            console.log(f"Ошибка при определении типа группы/канала {chat}: {e}", style="red")
-            return False
-
     async def _random_delay(self):
         """
         Sleeps for a random duration between min_delay and max_delay.
@@ -327,54 +310,84 @@ class ChatJoiner:
         console.print(f"Задержка {delay} перед подпиской на канал")
         await asyncio.sleep(delay)
 
-    async def detect_chat(
+    async def resolve_chat(
         self,
         client: TelegramClient,
         chat_link: str
-    ) -> ChatType | JoinStatus:
+    ) -> ChatInfo | JoinStatus:
         """
-        Detect chat type
+        Resolves a chat with a single request: CheckChatInvite for invite links,
+        get_entity for usernames. Type, privacy, join-request flag and membership
+        are all taken from that one response.
+
+        Usernames are first looked up in the session's entity cache. A chat found
+        in the membership index needs no request at all; otherwise the full entity
+        is fetched by its cached id instead of resolving the username again.
+
         Args:
             client: TelegramClient instance.
             chat_link: Chat link or username.
 
         Returns:
-            ChatType: Chat type (CHANNEL, GROUP, UNKNOWN) or JoinStatus.
+            ChatInfo: The resolved chat, or JoinStatus in case of error.
         """
         try:
-            if "joinchat" in chat_link or "/+" in chat_link:
-                hash = chat_link.split("/")[-1].lstrip("+")
-                res = await client(CheckChatInviteRequest(hash=hash))
-
-                if isinstance(res, ChatInviteAlready):
-                    entity = await client.get_entity(res.chat)
-                    if isinstance(entity, Channel):
-                        return ChatType.CHANNEL if not entity.megagroup else ChatType.GROUP
-                    elif isinstance(entity, Chat):
-                        return ChatType.GROUP
-                    else:
-                        return ChatType.UNKNOWN
-
-                if hasattr(res, 'channel') and res.channel:
-                    return ChatType.CHANNEL
-
-            entity = await client.get_entity(chat_link)
-            if isinstance(entity, Channel):
-                return ChatType.GROUP if entity.megagroup else ChatType.CHANNEL
-            elif isinstance(entity, Chat):
-                return ChatType.GROUP
-            else:
-                return ChatType.UNKNOWN
-
-        except FloodWaitError as e:
-            return JoinStatus.FLOOD, e.seconds
+            if "joinchat" in chat_link or "/+" in chat_link or chat_link.startswith("+"):
+                invite_hash = chat_link.split("/")[-1].lstrip("+")
+                res = await client(CheckChatInviteRequest(hash=invite_hash))
+                if isinstance(res, (ChatInviteAlready, ChatInvitePeek)):
+                    info = self._entity_info(res.chat)
+                    info.private = True
+                    info.member = isinstance(res, ChatInviteAlready)
+                    info.invite_hash = invite_hash
+                    return info
+                if isinstance(res, ChatInvite):
+                    chat_type = ChatType.CHANNEL if res.channel and not res.megagroup else ChatType.GROUP
+                    return ChatInfo(
+                        type=chat_type,
+                        private=True,
+                        join_request=bool(res.request_needed),
+                        invite_hash=invite_hash,
+                    )
+                return ChatInfo(type=ChatType.UNKNOWN)
+
+            peer = await client.get_input_entity(chat_link)
+            if self._memberships_loaded and utils.get_peer_id(peer) in self._member_ids:
+                return ChatInfo(type=ChatType.UNKNOWN, member=True)
+            return self._entity_info(await client.get_entity(peer))
+        except (InviteHashExpiredError, InviteHashInvalidError):
+            return JoinStatus.SKIP
+        except FloodWaitError:
+            return JoinStatus.FLOOD
         except Exception as e:
+            if "private and you lack permission" in str(e):
+                return JoinStatus.BANNED
             if "you are not part of" in str(e).lower():
-                return ChatType.GROUP
-            elif "A wait of" in str(e):
-                return JoinStatus.FLOOD
+                return ChatInfo(type=ChatType.GROUP, private=True)
             logger.error(f"Ошибка при определении типа чата {chat_link}: {e}", exc_info=True)
-            return ChatType.UNKNOWN
+            return ChatInfo(type=ChatType.UNKNOWN)
+
+    def _entity_info(self, entity) -> ChatInfo:
+        """
+        Builds ChatInfo from a resolved entity. Membership comes from the
+        entity's "left" flag, so no extra get_permissions request is needed.
+        """
+        if isinstance(entity, Channel):
+            return ChatInfo(
+                type=ChatType.GROUP if entity.megagroup else ChatType.CHANNEL,
+                private=bool(entity.join_request) or not entity.username,
+                join_request=bool(entity.join_request),
+                member=not entity.left,
+                entity=entity,
+            )
+        if isinstance(entity, Chat):
+            return ChatInfo(
+                type=ChatType.GROUP,
+                private=True,
+                member=not entity.left,
+                entity=entity,
+            )
+        return ChatInfo(type=ChatType.UNKNOWN, entity=entity)
 
     def clean_chat_link(self, chat_link: str) -> str:
         if chat_link.startswith("https://t.me/"):
@@ -1,5 +1,16 @@
 from src.managers.clone.extractor import ContentExtractor
 from src.managers.clone.publisher import ContentPublisher
 from src.managers.clone.uniquifier import ContentUniquifier
+from src.managers.clone.pipeline import ClonePipeline
+from src.managers.clone.rate_limiter import TokenBucket
+from src.managers.clone.ledger import PublishLedger, get_publish_ledger
+from src.managers.clone.rate_controller import AdaptiveDelay, RateController, get_rate_controller
+from src.managers.clone.schedule import ScheduleCalendar
+from src.managers.clone.source_hub import SourceHub
+from src.managers.clone.media_cache import MediaCache, get_media_cache
 
-__all__ = [ContentExtractor, ContentPublisher, ContentUniquifier]
+__all__ = [
+    ContentExtractor, ContentPublisher, ContentUniquifier, ClonePipeline, TokenBucket, PublishLedger, get_publish_ledger,
+    AdaptiveDelay, RateController, get_rate_controller, ScheduleCalendar, SourceHub,
+    MediaCache, get_media_cache
+]
@@ -1,14 +1,43 @@
-from typing import Dict
+from typing import Dict, Optional
 from telethon.tl.types import (
-    MessageMediaPhoto, MessageMediaDocument, DocumentAttributeVideo
+    MessageMediaPhoto, MessageMediaDocument,
+    DocumentAttributeVideo, DocumentAttributeAudio,
+    PhotoSize, PhotoSizeProgressive, PhotoCachedSize
 )
+from src.managers.clone.media_cache import MediaCache
 
 
 class ContentExtractor:
     """
     Отвечает за извлечение контента из сообщений.
+
+    Фото меньше порога скачиваются в память (bytes) и дальше обрабатываются
+    без записи на диск, остальной контент скачивается в downloads/.
+    Если уникализация фото или видео отключена, медиа не скачивается:
+    вместо файла в контент кладется само сообщение, и оно пересылается по ссылке.
+    Медиа, уже скачанное раньше (в том числе другим аккаунтом или из другого
+    источника с тем же ID в Telegram), берется из кеша медиа без скачивания.
     """
 
+    def __init__(
+        self,
+        memory_photo_limit: float = 0,
+        photo_by_reference: bool = False,
+        video_by_reference: bool = False,
+        media_cache: Optional[MediaCache] = None,
+    ):
+        """
+        Args:
+            memory_photo_limit (float): Размер фото в МБ, до которого оно скачивается в память.
+            photo_by_reference (bool): Не скачивать фото, а пересылать его по ссылке.
+            video_by_reference (bool): Не скачивать видео, а пересылать его по ссылке.
+            media_cache (Optional[MediaCache]): Кеш скачанных медиа.
+        """
+        self.memory_photo_limit = int(memory_photo_limit * 1024 * 1024)
+        self.photo_by_reference = photo_by_reference
+        self.video_by_reference = video_by_reference
+        self.media_cache = media_cache
+
     async def extract_content(self, message) -> Dict:
         """
         Извлекает контент (текст, изображения, видео, аудио) из сообщения.
@@ -20,20 +49,90 @@ class ContentExtractor:
             Dict: Словарь с извлеченным контентом.
         """
         content = {"text": message.text or ""}
+        # Медиа из сообщений с запретом пересылки по ссылке не отправить
+        by_reference = not getattr(message, "noforwards", False)
         if message.media:
             if isinstance(message.media, MessageMediaPhoto):
-                content["photo"] = await message.download_media(file="downloads/")
+                if self.photo_by_reference and by_reference:
+                    content["photo"] = message
+                else:
+                    content["photo"] = await self._download_photo(message)
             elif isinstance(message.media, MessageMediaDocument):
                 document = message.media.document
+                video_by_reference = self.video_by_reference and by_reference
                 for attr in document.attributes:
                     if isinstance(attr, DocumentAttributeVideo) and attr.round_message:
-                        content["video"] = await message.download_media(file="downloads/")
+                        content["video"] = await self._download_video(message, video_by_reference)
                         content["is_round"] = True
                         break
                 else:
                     if document.mime_type.startswith("video"):
-                        content["video"] = await message.download_media(file="downloads/")
+                        content["video"] = await self._download_video(message, video_by_reference)
                     elif document.mime_type.startswith("audio"):
-                        content["audio"] = await message.download_media(file="downloads/")
+                        content["audio"] = await self._download(message)
+                duration = self._get_duration(document)
+                if duration:
+                    content["duration"] = duration
 
         return content
+
+    def _get_duration(self, document) -> float:
+        """
+        Возвращает длительность видео или аудио из атрибутов документа.
+        """
+        for attr in document.attributes:
+            if isinstance(attr, (DocumentAttributeVideo, DocumentAttributeAudio)):
+                return attr.duration or 0
+        return 0
+
+    async def _download_video(self, message, by_reference: bool):
+        """
+        Скачивает видео в downloads/ или возвращает само сообщение для пересылки по ссылке.
+        """
+        if by_reference:
+            return message
+        return await self._download(message)
+
+    async def _download_photo(self, message):
+        """
+        Скачивает фото в память, если оно не больше порога, иначе в downloads/.
+
+        Returns:
+            Путь к файлу или содержимое фото (bytes).
+        """
+        size = self._get_photo_size(message.media.photo)
+        return await self._download(message, in_memory=bool(size) and size <= self.memory_photo_limit)
+
+    async def _download(self, message, in_memory: bool = False):
+        """
+        Скачивает медиа сообщения в downloads/ или в память, если его нет в кеше.
+
+        Returns:
+            Путь к файлу или содержимое (bytes).
+        """
+        key = MediaCache.media_key(message) if self.media_cache else None
+        if key:
+            cached = await (self.media_cache.read(key) if in_memory else self.media_cache.checkout(key))
+            if cached is not None:
+                return cached
+        result = await message.download_media(file=bytes if in_memory else "downloads/")
+        if key and result:
+            if in_memory:
+                await self.media_cache.store_bytes(key, result, ".jpg")
+            else:
+                await self.media_cache.store(key, result)
+        return result
+
+    def _get_photo_size(self, photo) -> int:
+        """
+        Возвращает размер самой большой версии фото в байтах, 0 если он неизвестен.
+        """
+        sizes = [0]
+        for size in getattr(photo, "sizes", []):
+            if isinstance(size, PhotoSize):
+                sizes.append(size.size)
+            elif isinstance(size, PhotoSizeProgressive):
+                sizes.append(max(size.sizes))
+            elif isinstance(size, PhotoCachedSize):
+                sizes.append(len(size.bytes))
+        return max(sizes)
@@ -0,0 +1,152 @@
+import os
+import time
+import asyncio
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.logger import logger
+
+
+class PublishLedger:
+    """
+    Журнал публикаций: какие сообщения источника уже опубликованы в какие целевые каналы.
+
+    Хранится в SQLite (WAL), записи копятся в памяти и пишутся пачками.
+    Опубликованные ID по каждому источнику загружаются в память при первом
+    обращении, поэтому проверка перед скачиванием не обращается к диску.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 5.0):
+        """
+        Args:
+            path (str): Путь к файлу базы.
+            batch_size (int): Записей, после которых пачка пишется на диск.
+            flush_interval (float): Максимальное время в секундах между записями на диск.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS published ("
+            "source_id INTEGER NOT NULL, "
+            "message_id INTEGER NOT NULL, "
+            "target TEXT NOT NULL, "
+            "target_message_id INTEGER, "
+            "published_at REAL NOT NULL, "
+            "PRIMARY KEY (source_id, message_id, target))"
+        )
+        self._db.commit()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._published: Dict[int, Dict[str, Set[int]]] = {}
+        self._pending: List[Tuple[int, int, str, Optional[int], float]] = []
+        self._flushed_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def is_published(self, source_id: int, message_id: int, target: str) -> bool:
+        """
+        Проверяет, опубликовано ли сообщение источника в целевой канал.
+        """
+        return message_id in self._source(source_id).get(target, ())
+
+    def pending_targets(self, source_id: int, message_id: int, targets: Iterable[str]) -> List[str]:
+        """
+        Возвращает целевые каналы, в которые сообщение еще не опубликовано.
+        """
+        published = self._source(source_id)
+        return [target for target in targets if message_id not in published.get(target, ())]
+
+    def resume_point(self, source_id: int, targets: Iterable[str]) -> Optional[int]:
+        """
+        Возвращает ID сообщения источника, после которого нужно продолжить
+        публикацию в указанные каналы: все записанные для них сообщения до него
+        включительно опубликованы во все эти каналы. Если пост опубликован
+        не во все каналы, продолжение начинается с него. None, если для этих
+        каналов записей нет.
+        """
+        published = self._source(source_id)
+        targets = list(targets)
+        message_ids = sorted(set().union(*(published.get(target, ()) for target in targets)))
+        if not message_ids:
+            return None
+        for message_id in message_ids:
+            if any(message_id not in published.get(target, ()) for target in targets):
+                return message_id - 1
+        return message_ids[-1]
+
+    def record(
+        self,
+        source_id: int,
+        message_id: int,
+        target: str,
+        target_message_id: Optional[int] = None,
+    ) -> None:
+        """
+        Отмечает сообщение опубликованным в целевом канале. На диск запись
+        попадет со следующей пачкой.
+        """
+        self._source(source_id).setdefault(target, set()).add(message_id)
+        self._pending.append((source_id, message_id, target, target_message_id, time.time()))
+
+    async def flush_if_due(self) -> None:
+        """
+        Пишет накопленные записи, если пачка заполнена или прошел интервал.
+        """
+        if len(self._pending) >= self.batch_size or (
+            self._pending and time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Пишет все накопленные записи одной транзакцией.
+        """
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            self._flushed_at = time.monotonic()
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка записи журнала публикаций: {e}")
+                self._pending = batch + self._pending
+
+    def _write(self, batch: List[Tuple[int, int, str, Optional[int], float]]) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO published "
+                "(source_id, message_id, target, target_message_id, published_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                batch
+            )
+
+    def _source(self, source_id: int) -> Dict[str, Set[int]]:
+        published = self._published.get(source_id)
+        if published is None:
+            published = {}
+            rows = self._db.execute(
+                "SELECT target, message_id FROM published WHERE source_id = ?", (source_id,)
+            )
+            for target, message_id in rows:
+                published.setdefault(target, set()).add(message_id)
+            self._published[source_id] = published
+        return published
+
+
+_ledger: Optional[PublishLedger] = None
+
+
+def get_publish_ledger(path: str) -> PublishLedger:
+    """
+    Возвращает журнал публикаций, общий для всех аккаунтов процесса.
+
+    Args:
+        path (str): Путь к файлу базы.
+    """
+    global _ledger
+    if _ledger is None:
+        _ledger = PublishLedger(path)
+    return _ledger
@@ -0,0 +1,236 @@
+import os
+import uuid
+import shutil
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Union
+from telethon.tl.types import MessageMediaDocument, MessageMediaPhoto
+from src.logger import logger
+
+
+class MediaCache:
+    """
+    Кеш медиа на диске, общий для всех аккаунтов.
+
+    Скачанные оригиналы хранятся по ID фото или документа Telegram, результаты
+    детерминированной обработки (например, конвертации аудио) - по SHA-256
+    исходного файла. Уникальные варианты не кешируются: они должны отличаться
+    для каждой публикации.
+
+    Файлы кеша не выдаются наружу напрямую: для задачи создается жесткая ссылка
+    (или копия) в рабочей папке, которую можно удалить после публикации.
+    Запись атомарна (временный файл и os.replace), поэтому кеш можно использовать
+    из нескольких процессов. При превышении размера удаляются давно не использованные файлы.
+    """
+
+    def __init__(self, directory: str, max_size: float):
+        """
+        Args:
+            directory (str): Папка кеша.
+            max_size (float): Максимальный размер кеша в МБ.
+        """
+        self.directory = directory
+        self.max_size = int(max_size * 1024 * 1024)
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def media_key(message) -> Optional[str]:
+        """
+        Возвращает ключ медиа сообщения по ID фото или документа Telegram.
+        """
+        media = getattr(message, "media", None)
+        if isinstance(media, MessageMediaPhoto) and media.photo:
+            return f"photo-{media.photo.id}"
+        if isinstance(media, MessageMediaDocument) and media.document:
+            return f"document-{media.document.id}"
+        return None
+
+    @staticmethod
+    async def content_key(kind: str, file: Union[str, bytes]) -> str:
+        """
+        Возвращает ключ результата обработки файла по SHA-256 его содержимого.
+
+        Args:
+            kind (str): Вид обработки, например "ogg".
+            file (Union[str, bytes]): Путь к исходному файлу или его содержимое.
+        """
+        if isinstance(file, bytes):
+            return f"{kind}-{hashlib.sha256(file).hexdigest()}"
+
+        def digest() -> str:
+            sha = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            return sha.hexdigest()
+
+        return f"{kind}-{await asyncio.to_thread(digest)}"
+
+    async def checkout(self, key: str, directory: str = "downloads/", prefix: str = "") -> Optional[str]:
+        """
+        Создает рабочую копию файла из кеша.
+
+        Args:
+            key (str): Ключ файла.
+            directory (str): Папка для рабочей копии.
+            prefix (str): Префикс имени рабочей копии.
+
+        Returns:
+            Optional[str]: Путь к рабочей копии или None, если файла нет в кеше.
+        """
+        name = self._touch(key)
+        if name is None:
+            return None
+        source = os.path.join(self.directory, name)
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, f"{prefix}{key}_{uuid.uuid4().hex[:8]}{os.path.splitext(name)[1]}")
+        try:
+            await asyncio.to_thread(self._link, source, target)
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        except OSError as e:
+            logger.error(f"Не удалось взять файл {key} из кеша: {e}")
+            return None
+        return target
+
+    async def read(self, key: str) -> Optional[bytes]:
+        """
+        Возвращает содержимое файла из кеша или None, если его нет.
+        """
+        name = self._touch(key)
+        if name is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._read, os.path.join(self.directory, name))
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+
+    async def store(self, key: str, path: str) -> None:
+        """
+        Добавляет файл в кеш. Исходный файл остается на месте.
+        """
+        name = key + os.path.splitext(path)[1]
+        temp = self._temp_path(name)
+        try:
+            await asyncio.to_thread(self._link, path, temp)
+            os.replace(temp, os.path.join(self.directory, name))
+        except OSError as e:
+            logger.error(f"Не удалось сохранить файл {path} в кеш: {e}")
+            self._remove(temp)
+            return
+        self._add(key, name)
+
+    async def store_bytes(self, key: str, data: bytes, extension: str) -> None:
+        """
+        Добавляет содержимое файла в кеш.
+
+        Args:
+            key (str): Ключ файла.
+            data (bytes): Содержимое.
+            extension (str): Расширение файла, например ".jpg".
+        """
+        name = key + extension
+        temp = self._temp_path(name)
+        try:
+            await asyncio.to_thread(self._write, temp, data)
+            os.replace(temp, os.path.join(self.directory, name))
+        except OSError as e:
+            logger.error(f"Не удалось сохранить {key} в кеш: {e}")
+            self._remove(temp)
+            return
+        self._add(key, name)
+
+    def _scan(self) -> None:
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name.split(".")[0]] = (name, size)
+            self._size += size
+        self._evict()
+
+    def _touch(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        try:
+            os.utime(os.path.join(self.directory, entry[0]))
+        except OSError:
+            pass
+        return entry[0]
+
+    def _add(self, key: str, name: str) -> None:
+        self._forget(key)
+        try:
+            size = os.path.getsize(os.path.join(self.directory, name))
+        except OSError:
+            return
+        self._entries[key] = (name, size)
+        self._size += size
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= entry[1]
+
+    def _evict(self) -> None:
+        while self._size > self.max_size and self._entries:
+            key, (name, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self._remove(os.path.join(self.directory, name))
+            logger.info(f"Файл {name} удален из кеша медиа")
+
+    def _temp_path(self, name: str) -> str:
+        return os.path.join(self.directory, f".{name}.{uuid.uuid4().hex}.tmp")
+
+    @staticmethod
+    def _link(source: str, target: str) -> None:
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(source, target)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache: Optional[MediaCache] = None
+
+
+def get_media_cache(settings) -> MediaCache:
+    """
+    Возвращает кеш медиа, общий для всех аккаунтов процесса.
+
+    Args:
+        settings: Настройки кеша медиа.
+    """
+    global _cache
+    if _cache is None:
+        _cache = MediaCache(settings.directory, settings.max_size)
+    return _cache
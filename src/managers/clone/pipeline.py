@@ -0,0 +1,167 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.logger import logger
+
+Stage = Callable[[Any], Awaitable[Optional[Any]]]
+
+
+class ClonePipeline:
+    """
+    Конвейер клонирования: извлечение → уникализация → публикация.
+
+    Этапы работают одновременно и соединены ограниченными очередями:
+    пока сообщение N-1 публикуется, N уникализируется, а N+1 скачивается.
+    Перед публикацией задачи выстраиваются в исходном порядке.
+    Задачи, прошедшие извлечение, но не опубликованные до остановки,
+    передаются в discard, чтобы освободить их файлы.
+    """
+
+    def __init__(
+        self,
+        extract: Stage,
+        uniquify: Stage,
+        publish: Stage,
+        settings,
+        discard: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Args:
+            extract (Stage): Этап извлечения контента.
+            uniquify (Stage): Этап уникализации контента.
+            publish (Stage): Этап публикации контента.
+            settings: Настройки конвейера (количество воркеров и размер очередей).
+            discard (Optional[Callable[[Any], None]]): Вызывается для извлеченных задач,
+                которые не будут опубликованы из-за остановки конвейера.
+        """
+        self._stages = [
+            (extract, settings.extract_workers),
+            (uniquify, settings.uniquify_workers),
+            (publish, settings.publish_workers),
+        ]
+        self._queue_size = settings.queue_size
+        self._discard = discard
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._submitted = 0
+        self._next_seq = 0
+        self._reorder: Dict[int, Optional[Any]] = {}
+        self._reorder_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """
+        Запускает воркеры всех этапов.
+        """
+        if self._workers:
+            return
+        self._queues = [asyncio.Queue(maxsize=self._queue_size) for _ in self._stages]
+        for index, (_, workers) in enumerate(self._stages):
+            for _ in range(workers):
+                self._workers.append(asyncio.create_task(self._worker(index)))
+
+    async def submit(self, job: Any, stage: int = 0) -> None:
+        """
+        Ставит задачу в очередь этапа, по умолчанию - извлечения. Ждет, если очередь заполнена.
+
+        Args:
+            job: Задача для обработки.
+            stage (int): Этап, с которого начинается обработка, например уникализация
+                для уже извлеченного контента. Порядок перед публикацией сохраняется.
+        """
+        if not 0 <= stage < len(self._stages) - 1:
+            raise ValueError(f"Нельзя поставить задачу на этап {stage}")
+        if not self._workers:
+            raise RuntimeError("Конвейер остановлен")
+        seq = self._submitted
+        self._submitted += 1
+        await self._queues[stage].put((seq, job))
+        if not self._workers:
+            # Конвейер остановился, пока задача ждала места в очереди
+            self._drain()
+
+    async def join(self) -> None:
+        """
+        Ждет, пока все поставленные задачи пройдут все этапы.
+        """
+        for queue in self._queues:
+            await queue.join()
+
+    async def stop(self) -> None:
+        """
+        Останавливает воркеры, не дожидаясь необработанных задач.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._drain()
+        self._submitted = self._next_seq = 0
+
+    async def _worker(self, index: int) -> None:
+        handler, _ = self._stages[index]
+        inbox = self._queues[index]
+        while True:
+            seq, job = await inbox.get()
+            try:
+                result = None
+                try:
+                    result = await handler(job)
+                except Exception as e:
+                    logger.error(f"Ошибка на этапе {handler.__name__}: {e}")
+                await self._forward(index, seq, result)
+            finally:
+                inbox.task_done()
+
+    async def _forward(self, index: int, seq: int, result: Optional[Any]) -> None:
+        """
+        Передает результат следующему этапу. Последний этап получает
+        задачи строго в порядке поступления, пропущенные задачи (None)
+        только сдвигают очередь.
+        """
+        last = len(self._stages) - 1
+        if index == last:
+            return
+        if index + 1 < last and result is not None:
+            try:
+                await self._queues[index + 1].put((seq, result))
+            except asyncio.CancelledError:
+                self._discard_job(result)
+                raise
+            return
+        await self._release(seq, result)
+
+    async def _release(self, seq: int, result: Optional[Any]) -> None:
+        # Задача остается в буфере, пока не попадет в очередь публикации,
+        # поэтому при остановке ее можно освободить
+        self._reorder[seq] = result
+        async with self._reorder_lock:
+            while self._next_seq in self._reorder:
+                ready = self._reorder[self._next_seq]
+                if ready is not None:
+                    await self._queues[-1].put((self._next_seq, ready))
+                del self._reorder[self._next_seq]
+                self._next_seq += 1
+
+    def _drain(self) -> None:
+        """
+        Освобождает извлеченные задачи, оставшиеся в очередях и буфере порядка.
+        """
+        for queue in self._queues[1:]:
+            while not queue.empty():
+                _, job = queue.get_nowait()
+                queue.task_done()
+                self._discard_job(job)
+        for job in self._reorder.values():
+            self._discard_job(job)
+        self._reorder.clear()
+
+    def _discard_job(self, job: Optional[Any]) -> None:
+        if job is None or not self._discard:
+            return
+        try:
+            self._discard(job)
+        except Exception as e:
+            logger.error(f"Ошибка при освобождении задачи: {e}")
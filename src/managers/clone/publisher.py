@@ -1,73 +1,119 @@
+import io
 import os
-from typing import Dict, List
-from telethon import TelegramClient
+import time
+import asyncio
+import hashlib
+from datetime import datetime
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Union
+from telethon import TelegramClient, utils
+from telethon.errors import (
+    ChatWriteForbiddenError, FilePartMissingError, FilePartsInvalidError, FilePart0MissingError,
+    FileReferenceExpiredError, FloodWaitError, PeerFloodError
+)
+from telethon.tl.types import InputMediaUploadedDocument, InputMediaUploadedPhoto, Message
 from src.logger import console, logger
 
+UPLOAD_CACHE_SIZE = 128
+UPLOAD_CACHE_TTL = 6 * 60 * 60
+UPLOAD_ERRORS = (FilePartMissingError, FilePart0MissingError, FilePartsInvalidError)
+
 
 class ContentPublisher:
     """
     Отвечает за публикацию контента в целевые каналы.
+
+    Каждый файл загружается на сервер один раз: дескриптор загрузки кешируется
+    по SHA-256 содержимого и используется для всех каналов, элементов альбомов
+    и повторных отправок. Медиа, переданное сообщением-источником, отправляется
+    по ссылке без загрузки.
     """
 
-    def __init__(self, client: TelegramClient):
+    def __init__(
+        self,
+        client: TelegramClient,
+        on_write_forbidden: Optional[Callable[[str], None]] = None,
+        on_flood: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        """
+        Args:
+            client (TelegramClient): Клиент аккаунта.
+            on_write_forbidden (Optional[Callable[[str], None]]): Вызывается с именем канала,
+                если аккаунт больше не может в него писать.
+            on_flood (Optional[Callable[[str, Exception], None]]): Вызывается с именем канала
+                и ошибкой, если публикация не удалась из-за флуда.
+        """
         self.client = client
+        self.on_write_forbidden = on_write_forbidden
+        self.on_flood = on_flood
+        self._uploads: OrderedDict = OrderedDict()
 
-    async def publish_content(self, content: Dict, target_channel: str) -> bool:
+    async def publish_content(
+        self,
+        content: Dict,
+        target_channel: str,
+        schedule: Optional[datetime] = None,
+    ) -> Optional[Message]:
         """
         Публикует уникальный контент в целевой канал.
 
         Args:
             content (Dict): Уникальный контент для публикации.
             target_channel (str): Целевой канал.
+            schedule (Optional[datetime]): Время отложенной публикации, None - сразу.
 
         Returns:
-            bool: True, если публикация прошла успешно, иначе False.
+            Optional[Message]: Опубликованное сообщение или None, если публикация не удалась.
         """
         try:
             if not content.get("text") and not any(key in content for key in ["photo", "video", "audio", "video_note"]):
                 console.print(f"Пустой контент. Пропускаем публикацию в канал {target_channel}", style="yellow")
-                return False
+                return None
             caption = content.get("text", "")
             if len(caption) > 1024:
                 caption = caption[:1021] + "..."
 
             if content.get("photo"):
-                await self.client.send_file(
+                return await self._send_file(
                     target_channel,
                     content["photo"],
-                    caption=caption
+                    caption=caption,
+                    schedule=schedule
                 )
-                self._delete_file(content["photo"])
             elif content.get("video"):
                 if content.get("is_round"):
-                    await self.client.send_file(target_channel, content["video"], video_note=True)
-                    self._delete_file(content["video"])
-                else:
-                    await self.client.send_file(target_channel, content["video"], caption=caption)
-                    self._delete_file(content["video"])
+                    return await self._send_file(target_channel, content["video"], video_note=True, schedule=schedule)
+                return await self._send_file(target_channel, content["video"], caption=caption, schedule=schedule)
             elif content.get("audio"):
-                await self.client.send_file(target_channel, content["audio"], caption=caption)
-                self._delete_file(content["audio"])
+                return await self._send_file(target_channel, content["audio"], caption=caption, schedule=schedule)
             elif content.get("video_note"):
-                await self.client.send_file(target_channel, content["video_note"], video_note=True)
-                self._delete_file(content["video_note"])
-            else:
-                await self.client.send_message(target_channel, caption)
-            return True
+                return await self._send_file(target_channel, content["video_note"], video_note=True, schedule=schedule)
+            return await self.client.send_message(target_channel, caption, schedule=schedule)
         except Exception as e:
-            if "You can't write" in str(e):
+            if self._is_write_forbidden(e):
                 logger.error(f"Не может публиковать в канал {target_channel}")
-                return False
+                self._write_forbidden(target_channel)
+                return None
+            self._flood(target_channel, e)
             logger.error(f"Ошибка при публикации контента в канал {target_channel}: {e}")
-            return False
+            return None
 
-    async def publish_album(self, album_contents: List[Dict], channel: str) -> None:
+    async def publish_album(
+        self,
+        album_contents: List[Dict],
+        channel: str,
+        schedule: Optional[datetime] = None,
+    ) -> Optional[List[Message]]:
         """
         Публикует альбом медиафайлов в целевой канал.
 
         Args:
             album_contents (List[Dict]): Список уникализированных контентов.
             channel (str): Целевой канал.
+            schedule (Optional[datetime]): Время отложенной публикации, None - сразу.
+
+        Returns:
+            Optional[List[Message]]: Опубликованные сообщения альбома или None при ошибке.
         """
         try:
             files = []
@@ -83,13 +129,135 @@ class ContentPublisher:
                     files.append(content["audio"])
                     captions.append(content.get("text", ""))
             caption = ''.join(captions)
-            await self.client.send_file(channel, files, caption=caption)
+            messages = await self._send_file(channel, files, caption=caption, schedule=schedule)
             console.print(f"Альбом из {len(files)} файлов опубликован в канал {channel}.", style="green")
-
-            for file in files:
-                self._delete_file(file)
+            return messages
         except Exception as e:
+            if self._is_write_forbidden(e):
+                self._write_forbidden(channel)
+            self._flood(channel, e)
             logger.error(f"Ошибка при публикации альбома: {e}")
+            return None
+
+    def _is_write_forbidden(self, error: Exception) -> bool:
+        return isinstance(error, ChatWriteForbiddenError) or "You can't write" in str(error)
+
+    def _write_forbidden(self, channel: str) -> None:
+        if self.on_write_forbidden:
+            self.on_write_forbidden(channel)
+
+    def _flood(self, channel: str, error: Exception) -> None:
+        if self.on_flood and isinstance(error, (FloodWaitError, PeerFloodError)):
+            self.on_flood(channel, error)
+
+    async def _send_file(self, channel: str, file, video_note: bool = False, **kwargs):
+        """
+        Отправляет файл или альбом через кеш загрузок. Если сервер уже не хранит
+        загруженный файл или истекла ссылка на медиа источника, файл загружается
+        заново (сообщение-источник запрашивается заново) и отправка повторяется один раз.
+
+        Args:
+            channel (str): Целевой канал.
+            file: Путь к файлу, файл в памяти, сообщение-источник или их список для альбома.
+            video_note (bool): Отправить видео как кружок.
+
+        Returns:
+            Отправленное сообщение или список сообщений альбома.
+        """
+        files = file if isinstance(file, list) else [file]
+        for attempt in range(2):
+            media = [
+                await self._get_media(item, video_note, refresh=bool(attempt))
+                for item in files
+            ]
+            try:
+                return await self.client.send_file(
+                    channel,
+                    media if isinstance(file, list) else media[0],
+                    video_note=video_note,
+                    **kwargs
+                )
+            except UPLOAD_ERRORS as e:
+                if attempt:
+                    raise
+                logger.warning(f"Загруженный файл больше недоступен на сервере, повторная загрузка: {e}")
+            except FileReferenceExpiredError:
+                if attempt:
+                    raise
+                logger.warning(f"Ссылка на медиа истекла, обновление сообщений-источников для канала {channel}")
+                files = [await self._refresh_reference(item) for item in files]
+                if not isinstance(file, list):
+                    file = files[0]
+
+    async def _get_media(
+        self,
+        file: Union[str, bytes, io.BytesIO],
+        video_note: bool = False,
+        refresh: bool = False,
+    ):
+        """
+        Возвращает медиа для отправки, загружая файл только если его содержимое
+        еще не загружалось.
+
+        Args:
+            file (Union[str, bytes, io.BytesIO]): Путь к файлу, содержимое фото или файл в памяти.
+            video_note (bool): Видео будет отправлено как кружок.
+            refresh (bool): Загрузить файл заново, даже если он есть в кеше.
+
+        Returns:
+            InputMediaUploadedPhoto или InputMediaUploadedDocument, либо само
+            сообщение-источник для отправки по ссылке.
+        """
+        if isinstance(file, Message):
+            return file
+        if isinstance(file, bytes):
+            # Фото, скачанное в память и не прошедшее уникализацию
+            file = io.BytesIO(file)
+            file.name = "photo.jpg"
+        key = await self._file_hash(file)
+        cached = self._uploads.get(key)
+        if refresh or cached is None or time.monotonic() - cached[1] > UPLOAD_CACHE_TTL:
+            if isinstance(file, io.IOBase):
+                file.seek(0)
+            name = file if isinstance(file, str) else file.name
+            handle = await self.client.upload_file(file, file_name=os.path.basename(name))
+            cached = (handle, time.monotonic())
+            self._uploads[key] = cached
+            if len(self._uploads) > UPLOAD_CACHE_SIZE:
+                self._uploads.popitem(last=False)
+        self._uploads.move_to_end(key)
+
+        handle = cached[0]
+        if utils.is_image(file):
+            return InputMediaUploadedPhoto(file=handle)
+        attributes, mime_type = utils.get_attributes(file, video_note=video_note)
+        return InputMediaUploadedDocument(file=handle, mime_type=mime_type, attributes=attributes)
+
+    async def _refresh_reference(self, item):
+        """
+        Запрашивает сообщение-источник заново, чтобы получить свежую ссылку на медиа.
+        """
+        if not isinstance(item, Message):
+            return item
+        fresh = await self.client.get_messages(item.peer_id, ids=item.id)
+        return fresh or item
+
+    async def _file_hash(self, file: Union[str, io.BytesIO]) -> str:
+        """
+        Возвращает SHA-256 содержимого файла. Файлы на диске хешируются в потоке,
+        чтобы не блокировать цикл событий.
+        """
+        if isinstance(file, io.BytesIO):
+            return hashlib.sha256(file.getbuffer()).hexdigest()
+
+        def digest() -> str:
+            sha = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            return sha.hexdigest()
+
+        return await asyncio.to_thread(digest)
 
     def _delete_file(self, file_path: str) -> None:
         try:
@@ -98,12 +266,30 @@ class ContentPublisher:
                 console.print(f"Файл {file_path} удален.", style="green")
             else:
                 console.print(f"Файл {file_path} не найден.", style="yellow")
-            original_file = f'downloads/{file_path.replace("unique_", "")}'
-            if os.path.exists(original_file):
-                os.remove(original_file)
-                console.print(f"Файл {original_file} удален.", style="green")
-            else:
-                pass
-                # console.print(f"Файл {original_file} не найден.", style="yellow")
         except Exception as e:
             logger.error(f"Ошибка при удалении файла {file_path}: {e}")
+
+    def delete_files(self, contents: List[Dict], keep: Optional[List[Dict]] = None) -> None:
+        """
+        Удаляет файлы задачи после публикации во все каналы: скачанные оригиналы
+        и уникальные варианты. Один файл может входить в несколько вариантов
+        (общее аудио или оригинал при ошибке уникализации), поэтому удаление
+        выполняется один раз после всех публикаций.
+
+        Args:
+            contents (List[Dict]): Исходный и уникализированный контент задачи.
+            keep (Optional[List[Dict]]): Контент, файлы которого удалять нельзя
+                (оригиналы, которые еще используют другие аккаунты).
+        """
+        paths = self._file_paths(contents) - self._file_paths(keep or [])
+        for path in paths:
+            if os.path.exists(path):
+                self._delete_file(path)
+
+    def _file_paths(self, contents: List[Dict]) -> Set[str]:
+        return {
+            content[key]
+            for content in contents
+            for key in ("photo", "video", "audio", "video_note")
+            if isinstance(content.get(key), str)
+        }
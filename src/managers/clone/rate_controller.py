@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import random
+import asyncio
+import tempfile
+from typing import Dict, Optional
+from src.logger import logger
+
+
+class AdaptiveDelay:
+    """
+    Пауза между отправками, подстраиваемая по схеме AIMD.
+
+    Пока Telegram не ограничивает отправку, пауза после каждой успешной
+    отправки уменьшается на постоянный шаг; при флуде она умножается на
+    коэффициент. Фактическая пауза случайно отклоняется от текущей на долю jitter.
+    """
+
+    def __init__(self, delay: float, settings):
+        """
+        Args:
+            delay (float): Начальная пауза в секундах.
+            settings: Настройки адаптивной задержки.
+        """
+        self.settings = settings
+        self.delay = self._clamp(delay)
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> float:
+        """
+        Ждет, пока с предыдущей отправки пройдет пауза, и резервирует следующую.
+
+        Returns:
+            float: Сколько секунд пришлось ждать.
+        """
+        async with self._lock:
+            pause = max(0.0, self._next - time.monotonic())
+            if pause:
+                await asyncio.sleep(pause)
+            jitter = self.settings.jitter
+            self._next = time.monotonic() + self.delay * random.uniform(1 - jitter, 1 + jitter)
+            return pause
+
+    def success(self) -> None:
+        """
+        Аддитивно уменьшает паузу после отправки без флуда.
+        """
+        self.delay = self._clamp(self.delay - self.settings.step)
+
+    def flood(self) -> None:
+        """
+        Мультипликативно увеличивает паузу после флуда.
+        """
+        self.delay = self._clamp(max(self.delay, self.settings.min_delay) * self.settings.backoff)
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.settings.max_delay, max(self.settings.min_delay, delay))
+
+
+class RateController:
+    """
+    Адаптивные паузы публикации по ключам (аккаунт, аккаунт и целевой канал).
+
+    Выученные паузы сохраняются в JSON-файл и восстанавливаются при следующем
+    запуске, так что аккаунт сразу работает с найденной безопасной скоростью.
+    """
+
+    def __init__(self, settings, save_interval: float = 60.0):
+        """
+        Args:
+            settings: Настройки адаптивной задержки.
+            save_interval (float): Минимальное время в секундах между записями на диск.
+        """
+        self.settings = settings
+        self.path = settings.state_file
+        self.save_interval = save_interval
+        self._delays: Dict[str, AdaptiveDelay] = {}
+        self._saved: Dict[str, float] = self._load()
+        self._saved_at = time.monotonic()
+
+    def get(self, key: str, initial: float) -> AdaptiveDelay:
+        """
+        Возвращает паузу для ключа, при первом обращении - сохраненную или начальную.
+
+        Args:
+            key (str): Ключ паузы.
+            initial (float): Начальная пауза в секундах, если сохраненной нет.
+        """
+        delay = self._delays.get(key)
+        if delay is None:
+            delay = AdaptiveDelay(self._saved.get(key, initial), self.settings)
+            self._delays[key] = delay
+        return delay
+
+    def save_if_due(self) -> None:
+        """
+        Сохраняет паузы, если с прошлой записи прошел интервал.
+        """
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Атомарно записывает текущие паузы в файл.
+        """
+        self._saved_at = time.monotonic()
+        self._saved.update({key: round(delay.delay, 3) for key, delay in self._delays.items()})
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._saved, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить задержки публикации в {self.path}: {e}")
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {key: float(value) for key, value in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"Не удалось прочитать задержки публикации из {self.path}: {e}")
+            return {}
+
+
+_controller: Optional[RateController] = None
+
+
+def get_rate_controller(settings) -> RateController:
+    """
+    Возвращает контроллер пауз публикации, общий для всех аккаунтов процесса.
+
+    Args:
+        settings: Настройки адаптивной задержки.
+    """
+    global _controller
+    if _controller is None:
+        _controller = RateController(settings)
+    return _controller
@@ -0,0 +1,41 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты публикаций в один канал (token bucket).
+
+    Бакет вмещает burst токенов и пополняется со скоростью rate токенов в минуту.
+    Каждая отправка забирает один токен; если токенов нет, отправка ждет.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate (float): Сообщений в минуту, 0 - без ограничения.
+            burst (int): Сообщений, которые можно отправить подряд без ожидания.
+        """
+        self.rate = rate / 60
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Ждет, пока в бакете появится токен, и забирает его.
+        """
+        if not self.rate:
+            return
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
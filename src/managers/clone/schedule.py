@@ -0,0 +1,103 @@
+import time
+import heapq
+import random
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+from telethon import TelegramClient
+from telethon.tl.functions.messages import GetScheduledHistoryRequest
+from src.logger import console, logger
+
+
+class ScheduleCalendar:
+    """
+    Календарь отложенных публикаций одного целевого канала.
+
+    Посты отправляются сразу, но с датой публикации: Telegram сам публикует их
+    через случайный интервал друг после друга. Отложенных сообщений в канале
+    не может быть больше лимита - когда календарь заполнен, новое резервирование
+    ждет, пока Telegram опубликует самое раннее из них.
+    """
+
+    def __init__(self, channel: str, settings):
+        """
+        Args:
+            channel (str): Целевой канал.
+            settings: Настройки отложенных публикаций.
+        """
+        self.channel = channel
+        self.settings = settings
+        self._pending: List[float] = []
+        self._last = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def last(self) -> Optional[datetime]:
+        """
+        Время последней запланированной публикации.
+        """
+        return datetime.fromtimestamp(self._last, tz=timezone.utc) if self._last else None
+
+    async def load(self, client: TelegramClient) -> None:
+        """
+        Учитывает сообщения, уже запланированные в канале, например в прошлый запуск.
+        """
+        try:
+            result = await client(GetScheduledHistoryRequest(peer=self.channel, hash=0))
+        except Exception as e:
+            logger.error(f"Не удалось получить отложенные сообщения канала {self.channel}: {e}")
+            return
+        for message in getattr(result, "messages", []):
+            at = message.date.timestamp()
+            heapq.heappush(self._pending, at)
+            self._last = max(self._last, at)
+        if self._pending:
+            console.print(
+                f"В канале {self.channel} уже запланировано {len(self._pending)} сообщений",
+                style="blue"
+            )
+
+    async def reserve(self, count: int = 1) -> datetime:
+        """
+        Резервирует время следующей публикации.
+
+        Args:
+            count (int): Сколько сообщений будет опубликовано (элементов альбома).
+
+        Returns:
+            datetime: Время публикации.
+        """
+        async with self._lock:
+            self._expire()
+            while len(self._pending) + count > self.settings.limit and self._pending:
+                pause = max(1.0, self._pending[0] - time.time() + 5)
+                console.print(
+                    f"Канал {self.channel}: достигнут лимит отложенных сообщений, ожидание {pause:.0f} секунд",
+                    style="yellow"
+                )
+                await asyncio.sleep(pause)
+                self._expire()
+
+            at = float(int(max(
+                self._last + random.uniform(*self.settings.interval),
+                time.time() + self.settings.start_delay,
+            )))
+            self._last = at
+            for _ in range(count):
+                heapq.heappush(self._pending, at)
+            return datetime.fromtimestamp(at, tz=timezone.utc)
+
+    def cancel(self, date: datetime, count: int = 1) -> None:
+        """
+        Освобождает зарезервированное время, если публикация не удалась.
+        """
+        at = date.timestamp()
+        for _ in range(count):
+            if at in self._pending:
+                self._pending.remove(at)
+        heapq.heapify(self._pending)
+
+    def _expire(self) -> None:
+        now = time.time()
+        while self._pending and self._pending[0] <= now:
+            heapq.heappop(self._pending)
@@ -0,0 +1,128 @@
+from typing import Callable, Dict, List
+from telethon import utils
+from src.logger import console, logger
+
+
+class SourceHub:
+    """
+    Общая подписка аккаунтов на каналы-источники (режим live).
+
+    Если несколько аккаунтов клонируют один источник, новые посты обрабатывает
+    только один из них - слушатель. Он скачивает пост один раз и передает
+    извлеченный контент на уникализацию всем аккаунтам, подписанным на источник,
+    каждый публикует его в свои целевые каналы. Скачанные файлы удаляются после
+    публикации последним аккаунтом.
+
+    Когда слушатель останавливается, слушателем становится следующий подписанный аккаунт.
+    """
+
+    def __init__(self):
+        self._consumers: Dict[int, List] = {}
+        self._names: Dict[int, str] = {}
+
+    async def subscribe(self, cloner) -> None:
+        """
+        Подписывает клонер на каналы-источники, в которых состоит аккаунт.
+
+        Args:
+            cloner: ContentCloner аккаунта.
+        """
+        for channel, entity in (await self._resolve(cloner)).items():
+            # Без подписки обновления канала не приходят, слушать его аккаунт не может
+            if getattr(entity, "left", False):
+                continue
+            source_id = utils.get_peer_id(entity)
+            consumers = self._consumers.setdefault(source_id, [])
+            if cloner in consumers:
+                continue
+            consumers.append(cloner)
+            self._names[source_id] = channel
+            if len(consumers) == 1:
+                self._announce(source_id)
+            else:
+                console.print(
+                    f"{cloner.account_phone} | Источник {channel} слушает аккаунт {consumers[0].account_phone}",
+                    style="blue"
+                )
+
+    async def _resolve(self, cloner) -> Dict[str, object]:
+        """
+        Получает каналы-источники клонера. Ссылки разрешаются по кешу сущностей
+        сессии (каналы уже проверены при запуске), флаг участия в канале
+        запрашивается одним запросом на все источники.
+        """
+        peers = {}
+        for channel in cloner.source_channels:
+            try:
+                peers[channel] = await cloner.client.get_input_entity(channel)
+            except Exception as e:
+                logger.error(f"{cloner.account_phone} | Источник {channel} недоступен: {e}")
+        if not peers:
+            return {}
+        try:
+            entities = await cloner.client.get_entity(list(peers.values()))
+            return dict(zip(peers, entities))
+        except Exception as e:
+            logger.error(f"{cloner.account_phone} | Не удалось получить источники одним запросом: {e}")
+        resolved = {}
+        for channel, peer in peers.items():
+            try:
+                resolved[channel] = await cloner.client.get_entity(peer)
+            except Exception as e:
+                logger.error(f"{cloner.account_phone} | Источник {channel} недоступен: {e}")
+        return resolved
+
+    def unsubscribe(self, cloner) -> None:
+        """
+        Отписывает клонер от всех источников. Для источников, которые он слушал,
+        выбирается новый слушатель.
+        """
+        for source_id, consumers in list(self._consumers.items()):
+            if cloner not in consumers:
+                continue
+            was_listener = consumers[0] is cloner
+            consumers.remove(cloner)
+            if not consumers:
+                del self._consumers[source_id]
+            elif was_listener:
+                self._announce(source_id)
+
+    def is_listener(self, cloner, source_id: int) -> bool:
+        """
+        Проверяет, должен ли клонер обрабатывать новые посты источника.
+        Источник, на который никто не подписан, клонер обрабатывает сам.
+        """
+        consumers = self._consumers.get(source_id)
+        return not consumers or consumers[0] is cloner
+
+    def consumers(self, source_id: int) -> List:
+        """
+        Возвращает клонеры, публикующие посты источника.
+        """
+        return list(self._consumers.get(source_id, []))
+
+    def share(self, contents: List[Dict], count: int, delete: Callable[[List[Dict]], None]) -> Callable[[], None]:
+        """
+        Возвращает функцию освобождения общего контента: файлы удаляются,
+        когда ее вызовут все count аккаунтов.
+
+        Args:
+            contents (List[Dict]): Извлеченный контент поста.
+            count (int): Количество аккаунтов, получивших контент.
+            delete (Callable[[List[Dict]], None]): Удаляет файлы контента.
+        """
+        remaining = [count]
+
+        def release() -> None:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                delete(contents)
+
+        return release
+
+    def _announce(self, source_id: int) -> None:
+        listener = self._consumers[source_id][0]
+        console.print(
+            f"{listener.account_phone} | Аккаунт слушает источник {self._names[source_id]}",
+            style="blue"
+        )
@@ -1,18 +1,24 @@
 import os
-import subprocess
-from typing import Dict
+from typing import Dict, List, Optional
 import tempfile
 from src.logger import logger
 from src.managers.unique_manager import UniqueManager
+from src.managers.unique.ffmpeg import FFmpegError, get_ffmpeg_scheduler, job_priority
+from src.managers.clone.media_cache import MediaCache
 
 
 class ContentUniquifier:
     """
     Отвечает за уникализацию контента.
+
+    Результат конвертации аудио не зависит от случайных параметров и берется
+    из кеша медиа, если этот файл уже конвертировался.
     """
 
-    def __init__(self, unique_manager: UniqueManager):
+    def __init__(self, unique_manager: UniqueManager, media_cache: Optional[MediaCache] = None):
         self.unique_manager = unique_manager
+        self.media_cache = media_cache
+        self.ffmpeg = get_ffmpeg_scheduler(unique_manager.config.ffmpeg)
 
     async def make_content_unique(self, content: Dict) -> Dict:
         """
@@ -24,32 +30,66 @@ class ContentUniquifier:
         Returns:
             Dict: Уникализированный контент.
         """
-        unique_content = {}
+        return (await self.make_content_variants(content, 1))[0]
+
+    async def make_content_variants(self, content: Dict, count: int) -> List[Dict]:
+        """
+        Готовит несколько разных уникальных вариантов контента, по одному на целевой канал.
+        Медиа декодируется один раз на все варианты, аудио конвертируется один раз
+        и используется во всех вариантах. Если уникализация фото или видео
+        отключена, во все варианты попадает оригинал.
+
+        Args:
+            content (Dict): Оригинальный контент.
+            count (int): Количество вариантов.
+
+        Returns:
+            List[Dict]: Уникализированные варианты контента.
+        """
+        variants = [{} for _ in range(count)]
 
         if content.get("text"):
-            unique_content["text"] = await self.unique_manager.unique_text(content["text"])
+            texts = await self.unique_manager.unique_text_variants(content["text"], count)
+            for variant, text in zip(variants, texts):
+                variant["text"] = text
+
+        uniqueness = self.unique_manager.config.uniqueness
 
         if content.get("photo"):
-            unique_content["photo"] = self.unique_manager.unique_image(content["photo"])
+            if uniqueness.image.enabled:
+                photos = await self.unique_manager.unique_image_variants(content["photo"], count)
+            else:
+                photos = [content["photo"]] * count
+            for variant, photo in zip(variants, photos):
+                variant["photo"] = photo
 
         if content.get("video"):
-            unique_content["video"] = self.unique_manager.unique_video(content["video"])
+            if uniqueness.video.enabled:
+                videos = await self.unique_manager.unique_video_variants(
+                    content["video"], count, content.get("duration")
+                )
+            else:
+                videos = [content["video"]] * count
+            for variant, video in zip(variants, videos):
+                variant["video"] = video
 
         if content.get("audio"):
-            audio_path = content["audio"]
-            ogg_path = self._convert_to_ogg(audio_path)
-            unique_content["audio"] = ogg_path
+            ogg_path = await self._convert_to_ogg(content["audio"], content.get("duration"))
+            for variant in variants:
+                variant["audio"] = ogg_path
 
-        unique_content['is_round'] = content.get('is_round')
+        for variant in variants:
+            variant['is_round'] = content.get('is_round')
 
-        return unique_content
+        return variants
 
-    def _convert_to_ogg(self, audio_path: str) -> str:
+    async def _convert_to_ogg(self, audio_path: str, duration: Optional[float] = None) -> str:
         """
         Конвертирует аудиофайл в формат OGG (Opus) с использованием ffmpeg.
 
         Args:
             audio_path (str): Путь к исходному аудиофайлу.
+            duration (Optional[float]): Длительность аудио в секундах, если известна.
 
         Returns:
             str: Путь к сконвертированному файлу в формате OGG.
@@ -58,8 +98,19 @@ class ContentUniquifier:
             if not os.path.exists(audio_path):
                 raise FileNotFoundError(f"Файл не найден: {audio_path}")
 
-            with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as temp_file:
-                temp_ogg_path = temp_file.name
+            key = None
+            if self.media_cache:
+                key = await MediaCache.content_key("ogg", audio_path)
+                cached = await self.media_cache.checkout(key, directory=".", prefix="unique_")
+                if cached:
+                    logger.info(f"Аудиофайл {audio_path} взят из кеша: {cached}")
+                    return cached
+
+            name = os.path.splitext(os.path.basename(audio_path))[0]
+            with tempfile.NamedTemporaryFile(
+                prefix="unique_", suffix=f"_{name}.ogg", dir=".", delete=False
+            ) as temp_file:
+                ogg_path = temp_file.name
 
             command = [
                 "ffmpeg",
@@ -67,25 +118,23 @@ class ContentUniquifier:
                 "-y",
                 "-i", audio_path,
                 "-c:a", "libopus",
-                temp_ogg_path
+                ogg_path
             ]
 
-            logger.info(f"Конвертация аудиофайла {audio_path} в {temp_ogg_path}...")
-            subprocess.run(command, check=True)
-            logger.info(f"Файл успешно конвертирован: {temp_ogg_path}")
-
-            os.replace(temp_ogg_path, audio_path)
-            logger.info(f"Исходный файл заменен на сконвертированный: {audio_path}")
+            logger.info(f"Конвертация аудиофайла {audio_path} в {ogg_path}...")
+            await self.ffmpeg.run(command, job_priority(audio_path, duration))
+            logger.info(f"Файл успешно конвертирован: {ogg_path}")
+            if key:
+                await self.media_cache.store(key, ogg_path)
 
-            return audio_path
+            return ogg_path
 
         except FileNotFoundError as e:
             logger.error(f"Файл не найден: {e}")
             raise
-        except subprocess.CalledProcessError as e:
+        except FFmpegError as e:
             logger.error(f"Ошибка при конвертации аудио в OGG: {e}")
             raise
         except Exception as e:
             logger.error(f"Неизвестная ошибка: {e}")
             raise
-
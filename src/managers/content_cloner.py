@@ -1,20 +1,49 @@
+import time
 import asyncio
 import random
-from collections import deque
-from typing import List
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from telethon import TelegramClient, events
-from telethon.errors import FloodWaitError
+from telethon.errors import (
+    ChannelInvalidError, ChannelPrivateError, ChatWriteForbiddenError, FloodWaitError, PeerFloodError,
+    UserBannedInChannelError, UsernameInvalidError, UsernameNotOccupiedError
+)
 from src.logger import console, logger
 from src.managers import FileManager
 from src.managers.unique_manager import UniqueManager
 from src.managers.clone import (
-    ContentExtractor, ContentPublisher, ContentUniquifier
+    ContentExtractor, ContentPublisher, ContentUniquifier, ClonePipeline, TokenBucket,
+    AdaptiveDelay, ScheduleCalendar, SourceHub, get_media_cache, get_publish_ledger, get_rate_controller
+)
+
+# Ошибки, подтверждающие, что канал недоступен аккаунту. ValueError - сущность не найдена
+ACCESS_DENIED_ERRORS = (
+    ChannelInvalidError, ChannelPrivateError, ChatWriteForbiddenError, UserBannedInChannelError,
+    UsernameInvalidError, UsernameNotOccupiedError, ValueError
 )
+# Через сколько секунд повторить проверку после временной ошибки (сеть, флуд)
+ACCESS_RETRY_TTL = 60
+# Сколько каналов проверяется одновременно при запуске
+ACCESS_WARM_CONCURRENCY = 3
+
+# Канал, в который публикует текущая задача, и был ли при этом флуд
+_publishing: ContextVar[Optional[Dict]] = ContextVar("publishing", default=None)
 
 
 class ContentCloner:
     """
     Основной класс, управляющий процессом клонирования.
+
+    Опубликованные посты отмечаются в журнале публикаций: после перезапуска
+    они не скачиваются повторно, а режим реального времени сначала догоняет
+    пропущенные посты, начиная с первого, опубликованного не во все каналы.
+
+    Паузы между публикациями подстраиваются отдельно для аккаунта и для каждого
+    целевого канала: без флуда они сокращаются, при флуде растут. При отложенных
+    публикациях в режиме history пауз нет: время публикации задает календарь канала.
+
+    В режиме live с общей подпиской (SourceHub) посты источника скачивает один
+    аккаунт-слушатель, остальные получают готовый контент сразу на уникализацию.
     """
 
     def __init__(
@@ -22,6 +51,7 @@ class ContentCloner:
         config,
         client: TelegramClient,
         account_phone: str,
+        source_hub: Optional[SourceHub] = None,
     ):
         self.config = config
         self.client = client
@@ -33,13 +63,47 @@ class ContentCloner:
         self.mode = config.cloning.mode
         self.post_delay = config.timeouts.post_delay
         self.posts_to_clone = config.cloning.posts_to_clone
+        self.posts_range = config.cloning.posts_range
         self.unique_manager = UniqueManager(config, self.account_phone)
-        self.processed_albums = deque(maxlen=500)
+        self.source_hub = source_hub if self.mode == 'live' else None
         self._running = False
-
-        self.content_extractor = ContentExtractor()
-        self.content_uniquifier = ContentUniquifier(self.unique_manager)
-        self.content_publisher = ContentPublisher(self.client)
+        self._claimed = set()
+        self._access: Dict[str, Tuple[bool, float]] = {}
+        self.ledger = get_publish_ledger(config.cloning.ledger_file) if config.cloning.ledger_file else None
+        post_rate = config.timeouts.post_rate
+        self.rate_controller = get_rate_controller(post_rate) if post_rate.enabled else None
+        self.client.request_scheduler.on_flood = self._on_request_flood
+
+        media_cache = get_media_cache(config.cloning.media_cache) if config.cloning.media_cache.enabled else None
+        self.content_extractor = ContentExtractor(
+            config.cloning.memory_photo_limit,
+            photo_by_reference=not config.uniqueness.image.enabled,
+            video_by_reference=not config.uniqueness.video.enabled,
+            media_cache=media_cache,
+        )
+        self.content_uniquifier = ContentUniquifier(self.unique_manager, media_cache)
+        self.content_publisher = ContentPublisher(
+            self.client,
+            on_write_forbidden=self._revoke_access,
+            on_flood=self._on_publish_flood,
+        )
+        self.pipeline = ClonePipeline(
+            self._extract_stage,
+            self._uniquify_stage,
+            self._publish_stage,
+            config.cloning.pipeline,
+            discard=self._drop_job,
+        )
+        self.rate_limiters = {
+            channel: self._create_rate_limiter(channel)
+            for channel in self.target_channels
+        }
+        self.calendars: Dict[str, ScheduleCalendar] = {}
+        if self.mode == 'history' and config.cloning.schedule.enabled:
+            self.calendars = {
+                channel: ScheduleCalendar(channel, config.cloning.schedule)
+                for channel in self.target_channels
+            }
 
     def get_target_channels(self) -> List[str]:
         target_channels = []
@@ -57,6 +121,10 @@ class ContentCloner:
             )
         return target_channels
 
+    def _create_rate_limiter(self, channel: str) -> TokenBucket:
+        limit = self.config.cloning.target_limits.get(channel, self.config.cloning.publish_limit)
+        return TokenBucket(limit.rate, limit.burst)
+
     async def start(self) -> None:
         if not self.target_channels or not self.source_channels:
             console.print(
@@ -65,12 +133,27 @@ class ContentCloner:
             )
             return
         self._running = True
-        if self.mode == 'history':
-            await self._clone_history()
-        elif self.mode == 'live':
-            await self._monitor_realtime()
-        else:
-            console.print(f"Неизвестный режим работы: {self.mode}", style="red")
+        await self._warm_access()
+        self.pipeline.start()
+        try:
+            if self.mode == 'history':
+                await asyncio.gather(*(calendar.load(self.client) for calendar in self.calendars.values()))
+                await self._clone_history()
+                await self.pipeline.join()
+                self._report_schedule()
+            elif self.mode == 'live':
+                await self._monitor_realtime()
+            else:
+                console.print(f"Неизвестный режим работы: {self.mode}", style="red")
+        finally:
+            self._running = False
+            if self.source_hub:
+                self.source_hub.unsubscribe(self)
+            await self.pipeline.stop()
+            if self.ledger:
+                await self.ledger.flush()
+            if self.rate_controller:
+                self.rate_controller.save()
 
     async def stop(self) -> None:
         self._running = False
@@ -78,7 +161,10 @@ class ContentCloner:
 
     async def _check_channel_access(self, channel: str) -> bool:
         """
-        Проверяет доступность канала.
+        Проверяет доступность канала. Результат запоминается на access_ttl секунд,
+        так что на каждый пост запрос к Telegram не отправляется. После временной
+        ошибки (сеть, флуд) канал проверяется снова через ACCESS_RETRY_TTL секунд.
+        Канал, уже известный сессии (кеш сущностей аккаунта), проверяется без запроса.
 
         Args:
             channel (str): Имя или ссылка на канал.
@@ -86,46 +172,70 @@ class ContentCloner:
         Returns:
             bool: True, если канал доступен, иначе False.
         """
+        cached = self._access.get(channel)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        ttl = self.config.cloning.access_ttl
         try:
-            await self.client.get_entity(channel)
-            return True
+            await self.client.get_input_entity(channel)
+            available = True
         except Exception as e:
             logger.error(f"Канал {channel} недоступен: {e}")
             console.print(f"Канал {channel} недоступен: {e}", style="red")
-            return False
+            available = False
+            if not isinstance(e, ACCESS_DENIED_ERRORS):
+                ttl = min(ttl, ACCESS_RETRY_TTL)
+        self._access[channel] = (available, time.monotonic() + ttl)
+        return available
+
+    async def _warm_access(self) -> None:
+        """
+        Проверяет доступность всех каналов один раз при запуске. Неизвестные
+        сессии каналы разрешаются по сети, поэтому одновременно проверяется
+        не больше ACCESS_WARM_CONCURRENCY каналов.
+        """
+        semaphore = asyncio.Semaphore(ACCESS_WARM_CONCURRENCY)
+
+        async def check(channel: str) -> None:
+            async with semaphore:
+                await self._check_channel_access(channel)
+
+        await asyncio.gather(*(
+            check(channel)
+            for channel in dict.fromkeys(self.source_channels + self.target_channels)
+        ))
+
+    def _revoke_access(self, channel: str) -> None:
+        """
+        Отмечает канал недоступным после ошибки записи в него.
+        """
+        console.print(f"Нет прав на публикацию в канал {channel}", style="red")
+        self._access[channel] = (False, time.monotonic() + self.config.cloning.access_ttl)
 
     async def _clone_history(self) -> None:
-        if not self.posts_to_clone:
-            raise ValueError("Для режима работы по истории канала должно быть указано количество постов")
+        if not self.posts_to_clone and not self.posts_range:
+            raise ValueError("Для режима работы по истории канала должно быть указано количество или диапазон постов")
 
         for channel in self.source_channels:
             if not await self._check_channel_access(channel):
                 console.print(f"Канал {channel} недоступен. Пропускаем.", style="yellow")
                 continue
 
-            console.print(f"Клонирование последних {self.posts_to_clone} постов (от старых к новым) в канале {channel}", style="blue")
             try:
-                messages = []
-                async for message in self.client.iter_messages(channel, limit=self.posts_to_clone):
-                    messages.append(message)
-
-                messages.reverse()
-
-                for message in messages:
+                bounds = await self._history_bounds(channel)
+                if not bounds:
+                    console.print(f"В канале {channel} нет постов. Пропускаем.", style="yellow")
+                    continue
+                min_id, max_id = bounds
+                messages = self.client.iter_messages(
+                    channel, reverse=True, min_id=min_id, max_id=max_id
+                )
+                async for post in self._group_albums(messages):
                     if not self._running:
                         break
-                    if message.grouped_id and message.grouped_id in self.processed_albums:
-                        continue
-
-                    await self._process_message(message)
-
-                    if message.grouped_id:
-                        self.processed_albums.append(message.grouped_id)
-
-                    await self._random_delay(self.post_delay)
+                    await self.pipeline.submit(post)
             except FloodWaitError as e:
-                console.print(f"Лимиты превышены. Ожидание {e.seconds} секунд...", style="yellow")
-                await asyncio.sleep(e.seconds)
+                console.print(f"Канал {channel}: лимиты превышены на {e.seconds} секунд. Пропускаем.", style="yellow")
 
     async def _monitor_realtime(self) -> None:
         """
@@ -133,111 +243,373 @@ class ContentCloner:
         """
         console.print(f"{self.account_phone} | Запущено клонирование с каналов в реальном времени", style="blue")
 
-        self.message_queue = asyncio.Queue()
+        if self.source_hub:
+            await self.source_hub.subscribe(self)
 
         @self.client.on(events.NewMessage(chats=self.source_channels))
         async def handler(event):
-            if not self._running:
+            # Части альбомов собирает album_handler
+            if not self._running or event.grouped_id or not self._is_listener(event.chat_id):
+                return
+            await self.pipeline.submit(event.message)
+
+        @self.client.on(events.Album(chats=self.source_channels))
+        async def album_handler(event):
+            if not self._running or not self._is_listener(event.chat_id):
                 return
-            await self.message_queue.put(event)
+            await self.pipeline.submit(list(event.messages))
 
-        asyncio.create_task(self._process_message_queue())
+        await self._catch_up()
 
-        while self._running:
+        # При отключении клиента клонер отписывается, и источники слушает другой аккаунт
+        while self._running and self.client.is_connected():
             await asyncio.sleep(1)
 
-    async def _process_message_queue(self) -> None:
+    def _is_listener(self, source_id: int) -> bool:
+        return not self.source_hub or self.source_hub.is_listener(self, source_id)
+
+    async def _history_bounds(self, channel: str) -> Optional[Tuple[int, int]]:
         """
-        Обрабатывает сообщения из очереди с задержкой между ними.
+        Возвращает границы min_id/max_id (не включительно) для клонирования истории:
+        заданный диапазон ID постов или последние posts_to_clone постов.
+        None, если в канале нет постов.
         """
-        while self._running:
-            event = await self.message_queue.get()
+        if self.posts_range:
+            first, last = self.posts_range
+            console.print(f"Клонирование постов с {first} по {last} (от старых к новым) в канале {channel}", style="blue")
 
-            if event.grouped_id:
-                if event.grouped_id in self.processed_albums:
+            min_id, max_id = first - 1, last + 1
+        else:
+            console.print(f"Клонирование последних {self.posts_to_clone} постов (от старых к новым) в канале {channel}", style="blue")
+            latest = await self.client.get_messages(channel, limit=1)
+            if not latest:
+                return None
+            oldest = await self.client.get_messages(channel, limit=1, add_offset=self.posts_to_clone - 1)
+            min_id = oldest[0].id - 1 if oldest else 0
+            max_id = latest[0].id + 1
+        return min_id, max_id
+
+    async def _catch_up(self) -> None:
+        """
+        Публикует посты, вышедшие в источниках, пока клонирование было остановлено,
+        и посты, опубликованные не во все целевые каналы: начиная с первого такого
+        поста. Уже опубликованные посты пропускаются по журналу.
+        """
+        if not self.ledger:
+            return
+        for channel in self.source_channels:
+            try:
+                mark = self.ledger.resume_point(await self.client.get_peer_id(channel), self.target_channels)
+                if mark is None:
                     continue
-                self.processed_albums.append(event.grouped_id)
-                await self._process_album(event.message)
-            else:
-                await self._process_message(event.message)
+                latest = await self.client.get_messages(channel, limit=1)
+                if not latest or latest[0].id <= mark:
+                    continue
+                console.print(f"Канал {channel}: догоняем посты после {mark}", style="blue")
+                messages = self.client.iter_messages(
+                    channel, reverse=True, min_id=mark, max_id=latest[0].id + 1
+                )
+                async for post in self._group_albums(messages):
+                    if not self._running:
+                        return
+                    await self.pipeline.submit(post)
+            except FloodWaitError as e:
+                console.print(f"Канал {channel}: лимиты превышены на {e.seconds} секунд. Пропускаем.", style="yellow")
+            except Exception as e:
+                logger.error(f"Не удалось догнать пропущенные посты канала {channel}: {e}")
 
-            await self._random_delay(self.post_delay)
+    async def _group_albums(self, messages: AsyncIterator) -> AsyncIterator:
+        """
+        Собирает части альбомов из потока сообщений в хронологическом порядке.
+        Альбом отдается, как только приходит сообщение не из него.
 
-            self.message_queue.task_done()
+        Yields:
+            Посты - отдельные сообщения или списки сообщений альбома.
+        """
+        album: List = []
+        async for message in messages:
+            if album and message.grouped_id != album[0].grouped_id:
+                yield album
+                album = []
+            if message.grouped_id:
+                album.append(message)
+            else:
+                yield message
+        if album:
+            yield album
 
-    async def _process_message(self, message) -> None:
+    async def _extract_stage(self, post) -> Optional[Dict]:
         """
-        Обрабатывает сообщение: извлекает контент, уникализирует его и публикует в целевой канал.
-        Поддерживает альбомы (группы медиафайлов).
+        Этап извлечения: скачивает контент сообщения или всего альбома.
+        При общей подписке контент один раз скачивается для всех аккаунтов
+        источника и передается им на уникализацию.
 
         Args:
-            message: Сообщение для обработки.
+            post: Сообщение или список сообщений альбома.
+
+        Returns:
+            Optional[Dict]: Задача с извлеченным контентом или None, если публиковать нечего.
         """
+        messages = sorted(post, key=lambda msg: msg.id) if isinstance(post, list) else [post]
+        source = (messages[0].chat_id, messages[0].id)
+        consumers = self.source_hub.consumers(source[0]) if self.source_hub else []
+        if self not in consumers:
+            consumers.insert(0, self)
+        claims = [(consumer, consumer._claim(source)) for consumer in consumers]
+        claims = [(consumer, targets) for consumer, targets in claims if targets]
+        if not claims:
+            return None
+
+        contents = []
         try:
-            if message.grouped_id:
-                await self._process_album(message)
+            if isinstance(post, list):
+                console.print(f"Найден альбом из {len(messages)} сообщений.", style="blue")
+                for msg in messages:
+                    contents.append(await self.content_extractor.extract_content(msg))
             else:
-                await self._process_single_message(message)
-        except Exception as e:
-            logger.error(f"Ошибка при обработке сообщения: {e}")
-            console.print(f"Ошибка при обработке сообщения: {e}", style="red")
-
-    async def _process_single_message(self, message):
-        content = await self.content_extractor.extract_content(message)
-        if not content.get("text") and not any(key in content for key in ["photo", "video", "audio"]):
-            console.print("Сообщение пустое. Пропускаем.", style="yellow")
-            return
-
-        for channel in self.target_channels:
-            if not await self._check_channel_access(channel):
-                console.print(f"Канал {channel} недоступен. Пропускаем.", style="yellow")
+                content = await self.content_extractor.extract_content(post)
+                contents.append(content)
+                if not content.get("text") and not any(key in content for key in ["photo", "video", "audio"]):
+                    console.print("Сообщение пустое. Пропускаем.", style="yellow")
+                    contents = []
+        except BaseException:
+            # Задача выпадает из конвейера: пост снова можно взять, скачанное удаляется
+            self.content_publisher.delete_files(contents)
+            contents = []
+            raise
+        finally:
+            if not contents:
+                for consumer, _ in claims:
+                    consumer._claimed.discard(source)
+        if not contents:
+            return None
+
+        release = None
+        if len(claims) > 1:
+            release = self.source_hub.share(contents, len(claims), self.content_publisher.delete_files)
+        jobs = [
+            (consumer, {
+                "album": isinstance(post, list),
+                "contents": contents,
+                "source": source,
+                "ids": [msg.id for msg in messages],
+                "pending": targets,
+                "release": release,
+            })
+            for consumer, targets in claims
+        ]
+        own_job = None
+        for index, (consumer, job) in enumerate(jobs):
+            if consumer is self:
+                own_job = job
                 continue
+            try:
+                await consumer.pipeline.submit(job, stage=1)
+            except Exception as e:
+                logger.error(f"{consumer.account_phone} | Не удалось передать пост {source[1]} на уникализацию: {e}")
+                consumer._drop_job(job)
+            except BaseException:
+                # Непереданные задачи не будут опубликованы: освобождаем их долю общего контента
+                for other, other_job in jobs[index:]:
+                    other._drop_job(other_job)
+                if own_job:
+                    self._drop_job(own_job)
+                raise
+        return own_job
+
+    def _claim(self, source: Tuple[int, int]) -> List[str]:
+        """
+        Закрепляет пост источника за аккаунтом, чтобы он не обрабатывался дважды.
 
-            unique_content = await self.content_uniquifier.make_content_unique(content)
+        Returns:
+            List[str]: Целевые каналы, в которые пост еще не опубликован, пустой
+            список, если публиковать некуда или пост уже в обработке.
+        """
+        if not self._running or source in self._claimed:
+            return []
+        targets = self.target_channels
+        if self.ledger:
+            targets = self.ledger.pending_targets(*source, targets)
+            if not targets:
+                logger.info(f"Пост {source[1]} канала {source[0]} уже опубликован во все каналы. Пропускаем.")
+                return []
+        self._claimed.add(source)
+        return targets
+
+    def _drop_job(self, job: Dict) -> None:
+        """
+        Снимает закрепление поста и удаляет файлы задачи: после публикации или
+        если задача не будет опубликована. Повторный вызов ничего не освобождает.
+        """
+        self._claimed.discard(job["source"])
+        if job.get("targets"):
+            self.content_publisher.delete_files(
+                [content for contents in job["targets"].values() for content in contents],
+                keep=job["contents"],
+            )
+        self._release_contents(job)
 
-            result = await self.content_publisher.publish_content(unique_content, channel)
-            if result:
-                console.print(f"Сообщение опубликовано в канал {channel}", style="green")
+    def _release_contents(self, job: Dict) -> None:
+        """
+        Удаляет скачанные файлы задачи, общие файлы - после последнего аккаунта.
+        Общий контент освобождается задачей ровно один раз.
+        """
+        if job.get("released"):
+            return
+        job["released"] = True
+        if job.get("release"):
+            job["release"]()
+        else:
+            self.content_publisher.delete_files(job["contents"])
 
-    async def _process_album(self, message) -> None:
+    async def _uniquify_stage(self, job: Dict) -> Optional[Dict]:
         """
-        Обрабатывает альбом сообщений (группу медиафайлов).
+        Этап уникализации: готовит отдельный вариант контента для каждого целевого канала.
+        Все варианты одного файла создаются за одно декодирование.
         """
         try:
-            if not message.grouped_id:
-                console.print("Сообщение не является частью альбома.", style="yellow")
-                return
-            await asyncio.sleep(3)
-            all_messages = []
-            async for msg in self.client.iter_messages(message.chat_id, limit=200):
-                all_messages.append(msg)
-
-            album_messages = [msg for msg in all_messages if msg.grouped_id == message.grouped_id]
-            if not album_messages:
-                console.print(f"Не удалось найти сообщения альбома с grouped_id: {message.grouped_id}", style="yellow")
-                return
-
-            album_messages.reverse()
-            console.print(f"Найден альбом из {len(album_messages)} сообщений.", style="blue")
-
-            unique_contents = []
-            for msg in album_messages:
-                content = await self.content_extractor.extract_content(msg)
-                unique_content = await self.content_uniquifier.make_content_unique(content)
-                unique_contents.append(unique_content)
-                await asyncio.sleep(1)
-
-            for channel in self.target_channels:
+            channels = []
+            for channel in job["pending"]:
                 if not await self._check_channel_access(channel):
                     console.print(f"Канал {channel} недоступен. Пропускаем.", style="yellow")
                     continue
+                channels.append(channel)
+            if not channels:
+                self._drop_job(job)
+                return None
+
+            variants = await asyncio.gather(*(
+                self.content_uniquifier.make_content_variants(content, len(channels))
+                for content in job["contents"]
+            ), return_exceptions=True)
+            errors = [result for result in variants if isinstance(result, BaseException)]
+            if errors:
+                # Варианты остальных файлов альбома уже созданы и не будут опубликованы
+                self.content_publisher.delete_files(
+                    [variant for result in variants if not isinstance(result, BaseException) for variant in result],
+                    keep=job["contents"],
+                )
+                raise errors[0]
+        except BaseException:
+            self._drop_job(job)
+            raise
+        job["targets"] = {
+            channel: [content_variants[index] for content_variants in variants]
+            for index, channel in enumerate(channels)
+        }
+        return job
+
+    async def _publish_stage(self, job: Dict) -> None:
+        """
+        Этап публикации: отправляет подготовленный контент во все целевые каналы
+        одновременно, частота отправки в каждый канал ограничена своим лимитером.
+        """
+        account_pace = None if self.calendars else self._account_pace()
+        try:
+            if account_pace:
+                waited = await account_pace.wait()
+                if waited:
+                    console.print(f"Задержка {waited:.0f} секунд", style="yellow")
+            flooded = await asyncio.gather(*(
+                self._publish_to_target(channel, unique_contents, job)
+                for channel, unique_contents in job["targets"].items()
+            ))
+        finally:
+            self._drop_job(job)
+        if self.ledger:
+            await self.ledger.flush_if_due()
+
+        if account_pace:
+            if not any(flooded):
+                account_pace.success()
+            self.rate_controller.save_if_due()
+        elif not self.calendars:
+            await self._random_delay(self.post_delay)
 
-                await self.content_publisher.publish_album(unique_contents, channel)
-                console.print(f"Альбом опубликован в канал {channel}", style="green")
-                await asyncio.sleep(1)
+    async def _publish_to_target(self, channel: str, unique_contents: List[Dict], job: Dict) -> bool:
+        """
+        Публикует контент в один целевой канал.
 
-        except Exception as e:
-            logger.error(f"Ошибка при обработке альбома: {e}")
+        Returns:
+            bool: True, если при публикации был флуд.
+        """
+        state = {"channel": channel, "flooded": False}
+        _publishing.set(state)
+        await self.rate_limiters[channel].acquire()
+        target_pace = None if self.calendars else self._target_pace(channel)
+        if target_pace:
+            await target_pace.wait()
+        calendar = self.calendars.get(channel)
+        count = len(unique_contents) if job["album"] else 1
+        schedule = await calendar.reserve(count) if calendar else None
+        if job["album"]:
+            result = await self.content_publisher.publish_album(unique_contents, channel, schedule)
+        else:
+            result = await self.content_publisher.publish_content(unique_contents[0], channel, schedule)
+        if result and schedule:
+            console.print(f"Пост запланирован в канал {channel} на {schedule.astimezone():%d.%m %H:%M}", style="green")
+        elif result:
+            console.print(f"{'Альбом опубликован' if job['album'] else 'Сообщение опубликовано'} в канал {channel}", style="green")
+        elif schedule:
+            calendar.cancel(schedule, count)
+        if result and self.ledger:
+            sent = result if isinstance(result, list) else [result]
+            if len(sent) != len(job["ids"]):
+                sent = sent[:1] * len(job["ids"])
+            for message_id, message in zip(job["ids"], sent):
+                self.ledger.record(job["source"][0], message_id, channel, message.id)
+        if target_pace and result and not state["flooded"]:
+            target_pace.success()
+        return state["flooded"]
+
+    def _report_schedule(self) -> None:
+        for channel, calendar in self.calendars.items():
+            if calendar.last:
+                console.print(
+                    f"{self.account_phone} | Посты в канал {channel} запланированы до {calendar.last.astimezone():%d.%m %H:%M}",
+                    style="blue"
+                )
+
+    def _account_pace(self) -> Optional[AdaptiveDelay]:
+        if not self.rate_controller:
+            return None
+        return self.rate_controller.get(self.account_phone, sum(self.post_delay) / 2)
+
+    def _target_pace(self, channel: str) -> Optional[AdaptiveDelay]:
+        if not self.rate_controller:
+            return None
+        return self.rate_controller.get(f"{self.account_phone} {channel}", self.config.timeouts.post_rate.min_delay)
+
+    def _on_request_flood(self, request, seconds: int) -> None:
+        """
+        Вызывается планировщиком запросов на каждый FloodWait аккаунта.
+        Учитывается только флуд при публикации.
+        """
+        state = _publishing.get()
+        if state:
+            self._on_publish_flood(state["channel"], FloodWaitError(request=request, capture=seconds))
+
+    def _on_publish_flood(self, channel: str, error: Exception) -> None:
+        """
+        Увеличивает паузы после флуда: PeerFlood ограничивает весь аккаунт,
+        FloodWait - отправку в канал. За одну отправку пауза растет один раз.
+        """
+        state = _publishing.get()
+        if state and state["flooded"]:
+            return
+        if state:
+            state["flooded"] = True
+        if isinstance(error, PeerFloodError):
+            pace = self._account_pace()
+        else:
+            pace = self._target_pace(channel)
+        if pace:
+            pace.flood()
+            console.print(
+                f"{self.account_phone} | Флуд при публикации в канал {channel}, "
+                f"задержка увеличена до {pace.delay:.0f} секунд",
+                style="yellow"
+            )
 
     async def _random_delay(self, delay_range: tuple[int, int]) -> None:
         delay = random.randint(*delay_range)
@@ -0,0 +1,148 @@
+import os
+import heapq
+import asyncio
+import itertools
+from typing import List, Optional
+from src.logger import logger
+
+
+class FFmpegError(Exception):
+    """
+    Raised when an ffmpeg job fails, times out or cannot be started.
+    """
+
+    def __init__(self, command: List[str], message: str, returncode: Optional[int] = None):
+        self.command = command
+        self.returncode = returncode
+        super().__init__(message)
+
+
+class FFmpegScheduler:
+    """
+    Runs ffmpeg jobs as asyncio subprocesses with a shared concurrency cap.
+
+    Waiting jobs are started in priority order (lower first), so short clips
+    are not stuck behind long transcodes. The event loop is never blocked.
+    """
+
+    def __init__(self, max_jobs: int = 0, timeout: int = 600):
+        """
+        Args:
+            max_jobs (int): Maximum number of simultaneous jobs, 0 for half the CPU cores.
+            timeout (int): Default timeout of a single job in seconds.
+        """
+        self.max_jobs = max_jobs or max(1, (os.cpu_count() or 2) // 2)
+        self.timeout = timeout
+        self._active = 0
+        self._waiters: list = []
+        self._counter = itertools.count()
+
+    async def run(
+        self,
+        command: List[str],
+        priority: float = 0,
+        timeout: Optional[float] = None,
+    ) -> bytes:
+        """
+        Waits for a free slot and runs the command.
+
+        Args:
+            command (List[str]): Command line, starting with the executable.
+            priority (float): Job priority, lower values start first.
+            timeout (Optional[float]): Job timeout in seconds, defaults to the scheduler timeout.
+
+        Returns:
+            bytes: Captured stdout of the process.
+
+        Raises:
+            FFmpegError: If the process fails or exceeds the timeout.
+        """
+        await self._acquire(priority)
+        try:
+            return await self._execute(command, timeout or self.timeout)
+        finally:
+            self._release()
+
+    async def _execute(self, command: List[str], timeout: float) -> bytes:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            raise FFmpegError(command, f"Не удалось запустить {command[0]}: {e}")
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise FFmpegError(command, f"{command[0]} превысил таймаут {timeout} сек.")
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        if process.returncode != 0:
+            message = stderr.decode(errors="ignore").strip()
+            raise FFmpegError(command, message, process.returncode)
+        return stdout
+
+    async def _kill(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+            logger.info(f"Процесс ffmpeg {process.pid} остановлен")
+
+    async def _acquire(self, priority: float) -> None:
+        if self._active < self.max_jobs and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+def job_priority(path: str, duration: Optional[float] = None) -> float:
+    """
+    Returns the scheduling priority of a media file: its duration in seconds
+    if known, otherwise its size in megabytes as an approximation.
+    """
+    if duration:
+        return float(duration)
+    try:
+        return os.path.getsize(path) / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+
+_scheduler: Optional[FFmpegScheduler] = None
+
+
+def get_ffmpeg_scheduler(settings) -> FFmpegScheduler:
+    """
+    Returns the process-wide ffmpeg scheduler shared by all accounts.
+
+    Args:
+        settings: FFmpeg settings from the config.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FFmpegScheduler(settings.max_jobs, settings.timeout)
+    return _scheduler
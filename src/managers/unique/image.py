@@ -1,116 +1,105 @@
+import io
 import os
 import string
 import random
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from PIL import Image, ImageEnhance, ImageFilter
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple, Union
+from PIL import Image, ImageFilter
 import piexif
-from src.logger import console, logger
+from src.logger import console
+from src.managers.unique.jpeg import is_sequential_jpeg, lossless_unique_jpeg
 
 
 class ImageUniquenessManager:
     """
     Manages image uniqueness: cropping, brightness/contrast adjustment, rotation, filters, and metadata.
+
+    Random parameters are drawn in the event loop process, the pixel work runs in a
+    shared process pool that receives only file paths. With the "lossless" strategy
+    baseline JPEGs are rewritten without decoding pixels.
+
+    An image given as bytes is processed in memory and the copies are returned as
+    named BytesIO objects ready for send_file, so nothing touches the disk.
     """
 
     def __init__(self, config):
         self.config = config
+        self.pool = get_image_pool(config.uniqueness.image.workers)
 
-    def unique_image(self, image_path: str) -> str:
+    async def unique_image(self, image_path: Union[str, bytes]) -> Union[str, io.BytesIO]:
         """
         Applies uniqueness transformations to an image.
 
         Args:
-            image_path (str): Path to the input image.
+            image_path (Union[str, bytes]): Path to the input image or its contents.
 
         Returns:
-            str: Path to the unique image.
+            Union[str, io.BytesIO]: Path to the unique image, or the image in memory.
         """
-        console.log(f"Уникализация изображения: {image_path}", style="cyan")
-        image = Image.open(image_path)
-
-        width, height = image.size
-        crop_pixels = random.randint(*self.config.uniqueness.image.crop)
-        image = image.crop((crop_pixels, crop_pixels, width - crop_pixels, height - crop_pixels))
-
-        enhancer = ImageEnhance.Brightness(image)
-        brightness_factor = random.uniform(1 + self.config.uniqueness.image.brightness[0] / 100,
-                                          1 + self.config.uniqueness.image.brightness[1] / 100)
-        image = enhancer.enhance(brightness_factor)
-
-        enhancer = ImageEnhance.Contrast(image)
-        contrast_factor = random.uniform(1 + self.config.uniqueness.image.contrast[0] / 100,
-                                         1 + self.config.uniqueness.image.contrast[1] / 100)
-        image = enhancer.enhance(contrast_factor)
-
-        if self.config.uniqueness.image.rotation:
-            angle = random.uniform(-0.3, 0.3)
-            image = image.rotate(angle)
-
-        if self.config.uniqueness.image.filters:
-            image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
+        return (await self.unique_image_variants(image_path, 1))[0]
 
-        unique_image_path = f"unique_{os.path.basename(image_path)}"
-        image.save(unique_image_path)
-        if self.config.uniqueness.image.metadata == "replace":
-            unique_image_path = self._replace_image_metadata(unique_image_path)
-        elif self.config.uniqueness.image.metadata == "remove":
-            self._remove_image_metadata(unique_image_path)
-
-        return unique_image_path
-
-    def _replace_image_metadata(self, image_path: str) -> str:
+    async def unique_image_variants(
+        self,
+        image_path: Union[str, bytes],
+        count: int,
+    ) -> List[Union[str, io.BytesIO]]:
         """
-        Заменяет метаданные изображения на случайные значения и перезаписывает исходное изображение.
+        Produces several differently randomized copies of an image from a single decode.
 
         Args:
-            image_path (str): Путь к изображению.
+            image_path (Union[str, bytes]): Path to the input image or its contents.
+            count (int): Number of copies.
 
         Returns:
-            str: Путь к обновленному изображению.
+            List[Union[str, io.BytesIO]]: Paths to the unique images, or the images in memory.
         """
-        try:
-            metadata = self.generate_random_metadata()
-
-            image = Image.open(image_path)
-
-            exif_dict = {
-                "0th": {},
-                "Exif": {},
-                "GPS": {},
-                "1st": {},
-                "thumbnail": None,
-            }
+        in_memory = isinstance(image_path, bytes)
+        name = "photo.jpg" if in_memory else os.path.basename(image_path)
+        console.log(
+            f"Уникализация изображения: {'в памяти' if in_memory else image_path} (копий: {count})",
+            style="cyan"
+        )
+        outputs = [
+            (f"unique_{self._generate_random_string()}_{name}", self._random_params())
+            for _ in range(count)
+        ]
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self.pool, _unique_image_job, image_path, outputs)
+        if not in_memory:
+            return results
 
-            exif_dict["0th"][piexif.ImageIFD.Make] = metadata["Make"].encode("utf-8")
-            exif_dict["0th"][piexif.ImageIFD.Model] = metadata["Model"].encode("utf-8")
-            exif_dict["Exif"][piexif.ExifIFD.BodySerialNumber] = metadata["SerialNumber"].encode("utf-8")
+        images = []
+        for data, (output_name, _) in zip(results, outputs):
+            image = io.BytesIO(data)
+            image.name = output_name
+            images.append(image)
+        return images
 
-            exif_bytes = piexif.dump(exif_dict)
-
-            image.save(image_path, "jpeg", exif=exif_bytes, quality=95)
-
-            return image_path
-        except Exception as e:
-            logger.error(f"Ошибка при замене метаданных изображения: {e}")
-            raise
-
-    def _remove_image_metadata(self, image_path: str) -> None:
+    def _random_params(self) -> Dict:
         """
-        Removes metadata from an image.
+        Draws the random values for one unique copy of an image.
 
-        Args:
-            image_path (str): Path to the image.
+        Returns:
+            Dict: Parameters consumed by the worker process.
         """
-        try:
-            img = Image.open(image_path)
-
-            if "exif" not in img.info:
-                return
-
-            piexif.remove(image_path)
-            console.print(f"Метаданные изображения {image_path} удалены.", style="green")
-        except Exception as e:
-            logger.error(f"Ошибка при удалении метаданных изображения: {e}")
+        settings = self.config.uniqueness.image
+        params = {
+            "crop": random.randint(*settings.crop),
+            "brightness": random.uniform(1 + settings.brightness[0] / 100,
+                                         1 + settings.brightness[1] / 100),
+            "contrast": random.uniform(1 + settings.contrast[0] / 100,
+                                       1 + settings.contrast[1] / 100),
+            "angle": random.uniform(-0.3, 0.3) if settings.rotation else 0,
+            "blur": settings.filters,
+            "metadata_mode": settings.metadata,
+            "strategy": settings.strategy,
+        }
+        if settings.metadata == "replace":
+            params["metadata"] = self.generate_random_metadata()
+        return params
 
     def generate_random_metadata(self):
         """
@@ -132,3 +121,173 @@ class ImageUniquenessManager:
         start_date = datetime.now() - timedelta(days=365)
         random_date = start_date + timedelta(days=random.randint(0, 365))
         return random_date
+
+
+def _unique_image_job(
+    image_path: Union[str, bytes],
+    outputs: List[Tuple[str, Dict]],
+) -> List[Union[str, bytes]]:
+    """
+    Applies the drawn transformations to an image. Runs in a worker process.
+
+    The image is decoded once for all copies and every copy is encoded once:
+    brightness and contrast are applied as one lookup table and the EXIF block
+    is written by the same save.
+
+    Args:
+        image_path (Union[str, bytes]): Path to the input image or its contents.
+        outputs (List[Tuple[str, Dict]]): Output path and parameters from
+            ImageUniquenessManager._random_params for every copy.
+
+    Returns:
+        List[Union[str, bytes]]: Paths to the unique images, or their contents
+        when the input was given as bytes.
+    """
+    in_memory = isinstance(image_path, bytes)
+    if outputs[0][1]["strategy"] == "lossless":
+        results = _unique_jpeg_lossless(image_path, outputs)
+        if results is not None:
+            return results
+
+    source = Image.open(io.BytesIO(image_path) if in_memory else image_path)
+    if source.mode not in ("RGB", "L"):
+        source = source.convert("RGB")
+    source.load()
+
+    results = []
+    for output_path, params in outputs:
+        width, height = source.size
+        crop_pixels = params["crop"]
+        image = source.crop((crop_pixels, crop_pixels, width - crop_pixels, height - crop_pixels))
+
+        image = image.point(_brightness_contrast_lut(image, params["brightness"], params["contrast"]))
+
+        if params["angle"]:
+            image = image.rotate(params["angle"])
+
+        if params["blur"]:
+            image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
+
+        save_options = {"quality": 95}
+        if params["metadata_mode"] == "replace":
+            save_options["exif"] = _build_exif(params["metadata"])
+        if in_memory:
+            buffer = io.BytesIO()
+            image.save(buffer, "jpeg", **save_options)
+            results.append(buffer.getvalue())
+        else:
+            image.save(output_path, "jpeg", **save_options)
+            results.append(output_path)
+
+    return results
+
+
+def _unique_jpeg_lossless(
+    image_path: Union[str, bytes],
+    outputs: List[Tuple[str, Dict]],
+) -> Optional[List[Union[str, bytes]]]:
+    """
+    Rewrites a sequential JPEG in the compressed domain: edge crop on the block grid,
+    new metadata, reordered tables and a random comment. Brightness, contrast,
+    rotation and filters are not applied on this path.
+
+    Returns:
+        Optional[List[Union[str, bytes]]]: Same as _unique_image_job, or None if the
+        input is not a sequential JPEG and the pixel path must be used.
+    """
+    in_memory = isinstance(image_path, bytes)
+    if in_memory:
+        data = image_path
+    else:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    if not is_sequential_jpeg(data):
+        return None
+
+    results = []
+    for output_path, params in outputs:
+        exif = None
+        if params["metadata_mode"] == "replace":
+            exif = _build_exif(params["metadata"])
+        unique_data = lossless_unique_jpeg(data, params["crop"], exif)
+        if in_memory:
+            results.append(unique_data)
+            continue
+        with open(output_path, "wb") as f:
+            f.write(unique_data)
+        results.append(output_path)
+    return results
+
+
+def _brightness_contrast_lut(image: Image.Image, brightness: float, contrast: float) -> List[int]:
+    """
+    Builds a per-channel lookup table equivalent to ImageEnhance.Brightness
+    followed by ImageEnhance.Contrast.
+
+    Contrast pivots around the mean gray level of the brightened image, which is
+    derived from the grayscale histogram instead of a second pass over the pixels.
+
+    Args:
+        image (Image.Image): Image the table will be applied to.
+        brightness (float): Brightness factor.
+        contrast (float): Contrast factor.
+
+    Returns:
+        List[int]: Lookup table for Image.point, 256 entries per band.
+    """
+    def brighten(value: int) -> int:
+        return min(255, int(value * brightness))
+
+    histogram = image.convert("L").histogram()
+    total = sum(histogram) or 1
+    mean = int(sum(brighten(value) * count for value, count in enumerate(histogram)) / total + 0.5)
+
+    table = [
+        max(0, min(255, int(mean + contrast * (brighten(value) - mean))))
+        for value in range(256)
+    ]
+    return table * len(image.getbands())
+
+
+def _build_exif(metadata: Dict) -> bytes:
+    """
+    Собирает блок EXIF со случайными Make, Model и SerialNumber.
+
+    Args:
+        metadata (Dict): Значения Make, Model и SerialNumber.
+
+    Returns:
+        bytes: EXIF для передачи в Image.save.
+    """
+    exif_dict = {
+        "0th": {},
+        "Exif": {},
+        "GPS": {},
+        "1st": {},
+        "thumbnail": None,
+    }
+
+    exif_dict["0th"][piexif.ImageIFD.Make] = metadata["Make"].encode("utf-8")
+    exif_dict["0th"][piexif.ImageIFD.Model] = metadata["Model"].encode("utf-8")
+    exif_dict["Exif"][piexif.ExifIFD.BodySerialNumber] = metadata["SerialNumber"].encode("utf-8")
+
+    return piexif.dump(exif_dict)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """
+    Returns the process pool shared by all accounts for image processing.
+
+    Args:
+        workers (int): Number of worker processes, 0 to use the CPU count.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            mp_context=get_context("spawn"),
+        )
+    return _pool
@@ -0,0 +1,192 @@
+import os
+import random
+import struct
+from typing import List, Optional, Tuple
+
+SOI = 0xD8
+EOI = 0xD9
+SOS = 0xDA
+DQT = 0xDB
+DHT = 0xC4
+COM = 0xFE
+APP0 = 0xE0
+APP1 = 0xE1
+APP2 = 0xE2
+APP14 = 0xEE
+SEQUENTIAL_SOF = (0xC0, 0xC1)
+ANY_SOF = (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+KEPT_APP = (APP0, APP2, APP14)
+
+Segment = Tuple[int, bytes]
+
+
+class JpegFormatError(ValueError):
+    """
+    Raised when the data is not a JPEG the lossless path can rewrite.
+    """
+
+
+def parse_segments(data: bytes) -> Tuple[List[Segment], bytes]:
+    """
+    Splits a JPEG into the marker segments that precede the first scan and the
+    remaining bytes (SOS header, entropy-coded data, EOI), which are never touched.
+
+    Args:
+        data (bytes): JPEG file contents.
+
+    Returns:
+        Tuple[List[Segment], bytes]: (marker, payload) pairs and the scan tail.
+    """
+    if data[:2] != b"\xff\xd8":
+        raise JpegFormatError("Нет маркера SOI")
+    segments = []
+    offset = 2
+    while offset < len(data):
+        if data[offset] != 0xFF:
+            raise JpegFormatError(f"Ожидался маркер на позиции {offset}")
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == SOS:
+            return segments, data[offset:]
+        if marker in (SOI, EOI) or 0xD0 <= marker <= 0xD7:
+            raise JpegFormatError(f"Неожиданный маркер {marker:#x} до начала скана")
+        (length,) = struct.unpack(">H", data[offset + 2:offset + 4])
+        segments.append((marker, data[offset + 4:offset + 2 + length]))
+        offset += 2 + length
+    raise JpegFormatError("Не найден маркер SOS")
+
+
+def is_sequential_jpeg(data: bytes) -> bool:
+    """
+    Returns True for baseline/extended sequential Huffman JPEGs, the only kind
+    the lossless path rewrites.
+    """
+    try:
+        segments, _ = parse_segments(data)
+    except (JpegFormatError, struct.error, IndexError):
+        return False
+    frames = [marker for marker, _ in segments if marker in ANY_SOF]
+    return len(frames) == 1 and frames[0] in SEQUENTIAL_SOF
+
+
+def lossless_unique_jpeg(
+    data: bytes,
+    crop: int,
+    exif: Optional[bytes] = None,
+) -> bytes:
+    """
+    Makes a JPEG unique without decoding pixels.
+
+    - Trims up to ``crop`` pixels from the right and bottom edges by shrinking the
+      frame size in SOF, as far as the MCU grid allows without touching scan data.
+    - Drops EXIF/XMP and other APPn segments (JFIF, ICC and Adobe are kept) and
+      optionally writes a new EXIF block.
+    - Splits and reorders quantization and Huffman tables and adds a random comment,
+      so the file hash changes even when nothing else does.
+
+    Args:
+        data (bytes): Sequential JPEG file contents.
+        crop (int): Desired number of pixels to trim from each of the right and bottom edges.
+        exif (Optional[bytes]): EXIF block (as produced by piexif.dump) to embed.
+
+    Returns:
+        bytes: Rewritten JPEG.
+    """
+    segments, scan = parse_segments(data)
+
+    apps, frame, others = [], None, []
+    quant_tables, huffman_tables = [], []
+    for marker, payload in segments:
+        if marker in KEPT_APP:
+            apps.append((marker, payload))
+        elif APP0 <= marker <= 0xEF or marker == COM:
+            continue
+        elif marker == DQT:
+            quant_tables.extend(_split_dqt(payload))
+        elif marker == DHT:
+            huffman_tables.extend(_split_dht(payload))
+        elif marker in SEQUENTIAL_SOF:
+            frame = (marker, _crop_frame(payload, crop))
+        else:
+            others.append((marker, payload))
+    if frame is None:
+        raise JpegFormatError("Не найден заголовок SOF")
+
+    random.shuffle(quant_tables)
+    random.shuffle(huffman_tables)
+
+    head = [seg for seg in apps if seg[0] == APP0]
+    if exif:
+        head.append((APP1, exif))
+    head += [seg for seg in apps if seg[0] != APP0]
+    head.append((COM, os.urandom(random.randint(8, 32)).hex().encode()))
+    ordered = head + quant_tables + [frame] + huffman_tables + others
+
+    output = bytearray(b"\xff\xd8")
+    for marker, payload in ordered:
+        output += struct.pack(">BBH", 0xFF, marker, len(payload) + 2)
+        output += payload
+    output += scan
+    return bytes(output)
+
+
+def _split_dqt(payload: bytes) -> List[Segment]:
+    tables = []
+    offset = 0
+    while offset < len(payload):
+        precision = payload[offset] >> 4
+        size = 1 + 64 * (2 if precision else 1)
+        tables.append((DQT, payload[offset:offset + size]))
+        offset += size
+    return tables
+
+
+def _split_dht(payload: bytes) -> List[Segment]:
+    tables = []
+    offset = 0
+    while offset < len(payload):
+        size = 17 + sum(payload[offset + 1:offset + 17])
+        tables.append((DHT, payload[offset:offset + size]))
+        offset += size
+    return tables
+
+
+def _crop_frame(payload: bytes, crop: int) -> bytes:
+    """
+    Shrinks the frame dimensions so the decoder drops edge pixels while the number
+    of MCUs and of blocks of every component (and therefore the scan data) stays the same.
+    """
+    precision, height, width, components = struct.unpack(">BHHB", payload[:6])
+    if not crop or not height:
+        return payload
+
+    h_factors = [payload[7 + 3 * i] >> 4 for i in range(components)]
+    v_factors = [payload[7 + 3 * i] & 0x0F for i in range(components)]
+    new_width = width - _max_trim(width, crop, h_factors)
+    new_height = height - _max_trim(height, crop, v_factors)
+    return struct.pack(">BHHB", precision, new_height, new_width, components) + payload[6:]
+
+
+def _max_trim(size: int, crop: int, factors: List[int]) -> int:
+    """
+    Returns the largest trim (up to ``crop``) that keeps the block layout of one
+    dimension unchanged for interleaved and single-component scans alike.
+    """
+    max_factor = max(factors)
+
+    def layout(value: int) -> Tuple[int, ...]:
+        mcus = _ceil_div(value, 8 * max_factor)
+        blocks = tuple(_ceil_div(_ceil_div(value * factor, max_factor), 8) for factor in factors)
+        return (mcus,) + blocks
+
+    original = layout(size)
+    for trim in range(min(crop, size - 1), 0, -1):
+        if layout(size - trim) == original:
+            return trim
+    return 0
+
+
+def _ceil_div(value: int, divisor: int) -> int:
+    return -(-value // divisor)
@@ -0,0 +1,91 @@
+import os
+import json
+from collections import OrderedDict
+from typing import Dict, Optional
+from src.logger import logger
+from src.managers.unique.ffmpeg import FFmpegError, FFmpegScheduler, get_ffmpeg_scheduler
+
+
+class MediaProber:
+    """
+    Inspects media files with ffprobe and caches the result per file.
+
+    The cache key includes size and modification time, so a file rewritten
+    in place is probed again.
+    """
+
+    def __init__(self, ffmpeg: FFmpegScheduler, cache_size: int = 256):
+        self.ffmpeg = ffmpeg
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+
+    async def probe(self, path: str) -> Optional[Dict]:
+        """
+        Returns stream information about a media file.
+
+        Args:
+            path (str): Path to the media file.
+
+        Returns:
+            Optional[Dict]: Container format, duration, and the first video and
+            audio streams, or None if the file could not be probed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.error(f"Файл {path} недоступен для анализа: {e}")
+            return None
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries",
+            "format=format_name,duration:stream=codec_type,codec_name,pix_fmt,width,height,avg_frame_rate",
+            "-of", "json",
+            path
+        ]
+        try:
+            output = await self.ffmpeg.run(command)
+            info = self._parse(json.loads(output or b"{}"))
+        except (FFmpegError, ValueError) as e:
+            logger.error(f"Ошибка при анализе файла {path}: {e}")
+            return None
+
+        self._cache[key] = info
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return info
+
+    def _parse(self, data: Dict) -> Dict:
+        fmt = data.get("format", {})
+        info = {
+            "format": fmt.get("format_name", ""),
+            "duration": float(fmt.get("duration") or 0),
+            "video": None,
+            "audio": None,
+        }
+        for stream in data.get("streams", []):
+            kind = stream.get("codec_type")
+            if kind in ("video", "audio") and info[kind] is None:
+                info[kind] = stream
+        return info
+
+
+_prober: Optional[MediaProber] = None
+
+
+def get_media_prober(settings) -> MediaProber:
+    """
+    Returns the process-wide media prober shared by all accounts.
+
+    Args:
+        settings: FFmpeg settings from the config.
+    """
+    global _prober
+    if _prober is None:
+        _prober = MediaProber(get_ffmpeg_scheduler(settings))
+    return _prober
@@ -1,5 +1,5 @@
 import random
-from typing import Dict
+from typing import Dict, List
 from src.chatgpt import ChatGPTClient
 from src.logger import console
 
@@ -40,9 +40,9 @@ class TextUniquenessManager:
     async def unique_text(self, text: str) -> str:
         """
         Applies text uniqueness transformations:
+        - ChatGPT rewriting.
         - Word replacement.
         - Character masking.
-        - ChatGPT rewriting.
 
         Args:
             text (str): Input text.
@@ -50,16 +50,29 @@ class TextUniquenessManager:
         Returns:
             str: Unique text.
         """
-        if self.config.uniqueness.text.symbol_masking:
-            text = self._mask_characters(text)
+        return (await self.unique_text_variants(text, 1))[0]
 
+    async def unique_text_variants(self, text: str, count: int) -> List[str]:
+        """
+        Produces several unique versions of one text. The ChatGPT rewrite is
+        requested once and shared, character masking differs per version.
+
+        Args:
+            text (str): Input text.
+            count (int): Number of versions.
+
+        Returns:
+            List[str]: Unique texts.
+        """
         if self.config.uniqueness.text.rewrite:
-            text = await self._rewrite_with_chatgpt(text)
+            text = await self._rewrite_with_chatgpt(text) or text
 
         for original, replacement in self.replacements.items():
             text = text.replace(original, replacement)
 
-        return text
+        if not self.config.uniqueness.text.symbol_masking:
+            return [text] * count
+        return [self._mask_characters(text) for _ in range(count)]
 
     def _mask_characters(self, text: str) -> str:
         """
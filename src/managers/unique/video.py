@@ -1,113 +1,387 @@
 import os
+import math
 import random
+import shutil
 import string
-import subprocess
+import asyncio
+import tempfile
+from typing import Dict, List, Optional, Tuple
 from src.logger import console, logger
+from src.managers.unique.ffmpeg import FFmpegError, get_ffmpeg_scheduler, job_priority
+from src.managers.unique.probe import get_media_prober
+
+STREAM_COPY_FORMATS = ("mp4", "mov")
+STREAM_COPY_VIDEO_CODECS = ("h264",)
+STREAM_COPY_PIXEL_FORMATS = ("yuv420p", "yuvj420p")
+STREAM_COPY_AUDIO_CODECS = ("aac",)
+MIN_SEGMENT_DURATION = 20
 
 
 class VideoUniquenessManager:
     """
-    Manages video uniqueness: conversion to .mp4, metadata replacement, and metadata removal.
+    Manages video uniqueness: a single ffmpeg pass that converts the video to a
+    Telegram-compatible .mp4 and applies every enabled video uniqueness option
+    (metadata, frame rate variation, invisible overlay, hash change, audio speed).
+
+    Videos that are already H.264/AAC in MP4 are remuxed with stream copy when
+    stream_copy is enabled; only metadata and container changes apply to them.
+    Long videos that need a full encode are split into segments encoded in parallel.
+    Several copies of one video are produced from a single decode.
     """
 
     def __init__(self, config):
         self.config = config
+        self.ffmpeg = get_ffmpeg_scheduler(config.ffmpeg)
+        self.prober = get_media_prober(config.ffmpeg)
 
-    def unique_video(self, video_path: str) -> str:
+    async def unique_video(self, video_path: str, duration: Optional[float] = None) -> str:
         """
         Converts a video to a format compatible with Telegram and applies uniqueness transformations.
 
         Args:
             video_path (str): Path to the input video.
+            duration (Optional[float]): Video duration in seconds, used to schedule short clips first.
 
         Returns:
             str: Path to the unique video.
         """
-        output_path = f"converted_{os.path.splitext(os.path.basename(video_path))[0]}.mp4"
+        return (await self.unique_video_variants(video_path, 1, duration))[0]
+
+    async def unique_video_variants(
+        self,
+        video_path: str,
+        count: int,
+        duration: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Produces several differently randomized copies of a video. The input is
+        decoded once and split into one output per copy inside a single ffmpeg process.
+
+        Args:
+            video_path (str): Path to the input video.
+            count (int): Number of copies.
+            duration (Optional[float]): Video duration in seconds, used to schedule short clips first.
+
+        Returns:
+            List[str]: Paths to the unique videos.
+        """
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        outputs = [
+            (f"converted_{self._generate_random_string()}_{name}.mp4", self._random_params())
+            for _ in range(count)
+        ]
+        info = await self.prober.probe(video_path)
+        if info and info["duration"]:
+            duration = info["duration"]
+        has_audio = bool(info["audio"]) if info else None
+        priority = job_priority(video_path, duration)
 
+        reason = self._reencode_reason(info)
+        segments = self._segment_count(duration) if reason else 1
         try:
-            command = [
-                "ffmpeg",
-                "-loglevel", "error",
-                "-i", video_path,
-                "-c:v", "libx264",
-                "-profile:v", "baseline",
-                "-pix_fmt", "yuv420p",
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-movflags", "+faststart",
-                output_path
-            ]
-            subprocess.run(command, check=True)
-            console.print(f"Видео {video_path} успешно преобразовано в {output_path}.", style="green")
+            if not reason:
+                logger.info(f"Видео {video_path}: совместимо с Telegram, копирование потоков без перекодирования")
+                await self._remux(video_path, outputs, priority)
+            elif segments > 1:
+                logger.info(f"Видео {video_path}: параллельное перекодирование {segments} сегментов ({reason})")
+                await self._encode_segmented(video_path, outputs, has_audio, priority, duration, segments)
+            else:
+                logger.info(f"Видео {video_path}: полное перекодирование ({reason})")
+                await self._encode(video_path, outputs, has_audio, priority)
+            console.print(f"Видео {video_path} успешно уникализировано (копий: {count}).", style="green")
+            return [output_path for output_path, _ in outputs]
+        except FFmpegError as e:
+            logger.error(f"Ошибка при преобразовании видео: {e}")
+            self._remove_outputs(outputs)
+            return [video_path] * count
+        except BaseException:
+            self._remove_outputs(outputs)
+            raise
 
-            if self.config.uniqueness.video.metadata == "replace":
-                self._replace_video_metadata(output_path)
-            elif self.config.uniqueness.video.metadata == "remove":
-                self._remove_video_metadata(output_path)
+    def _remove_outputs(self, outputs: List[Tuple[str, Dict]]) -> None:
+        """
+        Removes copies that a failed or cancelled ffmpeg run may have partially written.
+        """
+        for output_path, _ in outputs:
+            try:
+                os.remove(output_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Не удалось удалить файл {output_path}: {e}")
 
-            return output_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Ошибка при преобразовании видео: {e.stderr}")
-            return video_path
+    async def _remux(
+        self,
+        video_path: str,
+        outputs: List[Tuple[str, Dict]],
+        priority: float,
+        input_args: Tuple[str, ...] = (),
+    ) -> None:
+        """
+        Writes every output with stream copy, applying only metadata and container changes.
+        """
+        command = ["ffmpeg", "-loglevel", "error", "-y", *input_args, "-i", video_path]
+        for output_path, params in outputs:
+            command += ["-c", "copy", *self._metadata_args(params), output_path]
+        await self.ffmpeg.run(command, priority)
 
-    def _replace_video_metadata(self, video_path: str) -> None:
+    async def _encode(
+        self,
+        video_path: str,
+        outputs: List[Tuple[str, Dict]],
+        has_audio: Optional[bool],
+        priority: float,
+        threads: Optional[int] = None,
+        metadata: bool = True,
+    ) -> None:
         """
-        Replaces video metadata with custom random data.
+        Encodes every output in one ffmpeg process. Several outputs share the decoder
+        through split/asplit filters, which needs to know whether the input has audio;
+        if that is unknown, the outputs are encoded one by one.
+        """
+        if len(outputs) > 1 and has_audio is None:
+            for output in outputs:
+                await self._encode(video_path, [output], has_audio, priority, threads, metadata)
+            return
 
-        Args:
-            video_path (str): Path to the video.
+        command = ["ffmpeg", "-loglevel", "error", "-y", "-i", video_path]
+        if len(outputs) > 1:
+            command += ["-filter_complex", self._split_graph([params for _, params in outputs], has_audio)]
+        for index, (output_path, params) in enumerate(outputs):
+            if len(outputs) > 1:
+                command += ["-map", f"[v{index}]"]
+                if has_audio:
+                    command += ["-map", f"[a{index}]"]
+            else:
+                command += self._filter_args(params)
+            command += self._encode_args()
+            if threads:
+                command += ["-threads", str(threads)]
+            if metadata:
+                command += self._metadata_args(params)
+            command.append(output_path)
+        await self.ffmpeg.run(command, priority)
+
+    def _split_graph(self, params_list: List[Dict], has_audio: bool) -> str:
         """
-        try:
-            make = self._generate_random_string(10)
-            model = self._generate_random_string(8)
-            serial_number = self._generate_random_string(12)
+        Builds a filter graph that decodes the input once and applies a separate
+        filter chain for every copy.
+        """
+        count = len(params_list)
+        graph = [
+            "[0:v:0]split={}{}".format(count, "".join(f"[sv{i}]" for i in range(count)))
+        ]
+        for index, params in enumerate(params_list):
+            graph.append(f"[sv{index}]{','.join(self._video_filters(params))}[v{index}]")
+        if has_audio:
+            graph.append(
+                "[0:a:0]asplit={}{}".format(count, "".join(f"[sa{i}]" for i in range(count)))
+            )
+            for index, params in enumerate(params_list):
+                audio_filters = self._audio_filters(params) or ["anull"]
+                graph.append(f"[sa{index}]{','.join(audio_filters)}[a{index}]")
+        return ";".join(graph)
 
-            command = [
-                "ffmpeg",
-                "-loglevel", "error",  # Убираем лишние логи
-                "-i", video_path,  # Входной файл
-                "-metadata", f"artist=UniqueManager",  # Метаданные
-                "-metadata", f"software=ContentCloner",
-                "-metadata", f"make={make}",
-                "-metadata", f"model={model}",
-                "-metadata", f"serial_number={serial_number}",
-                "-vf", "fps=30",  # Устанавливаем FPS на 30 (рекомендуется для Telegram)
-                "-c:v", "libx264",  # Кодек видео H.264
-                "-preset", "fast",  # Баланс между скоростью и качеством
-                "-crf", "23",  # Качество видео (меньше значение = лучше качество, 23 — оптимально)
-                "-movflags", "+faststart",  # Для быстрого старта воспроизведения
-                "-c:a", "aac",  # Кодек аудио AAC
-                "-b:a", "128k",  # Битрейт аудио (128 kbps — рекомендуется)
-                f"temp_{video_path}"  # Выходной файл
-            ]
-            subprocess.run(command, check=True)
-            os.replace(f"temp_{video_path}", video_path)
-            console.print(f"Метаданные видео {video_path} заменены.", style="green")
-        except Exception as e:
-            logger.error(f"Ошибка при замене метаданных видео: {e}")
+    def _segment_count(self, duration: Optional[float]) -> int:
+        """
+        Returns how many segments a video should be encoded in, 1 for a single process.
+        """
+        threshold = self.config.uniqueness.video.segment_threshold
+        if not threshold or not duration or duration < threshold:
+            return 1
+        segment_time = max(MIN_SEGMENT_DURATION, duration / self.ffmpeg.max_jobs)
+        return max(1, math.ceil(duration / segment_time))
 
-    def _remove_video_metadata(self, video_path: str) -> None:
+    async def _encode_segmented(
+        self,
+        video_path: str,
+        outputs: List[Tuple[str, Dict]],
+        has_audio: Optional[bool],
+        priority: float,
+        duration: float,
+        segments: int,
+    ) -> None:
         """
-        Removes metadata from a video.
+        Splits a long video at keyframes, encodes the segments in parallel on the
+        ffmpeg scheduler and concatenates them without re-encoding.
 
-        Args:
-            video_path (str): Path to the video.
+        Every segment of a copy uses the same random parameters, so the result
+        matches a single-process encode apart from segment boundaries.
         """
+        work_dir = tempfile.mkdtemp(prefix="segments_")
         try:
-            command = [
+            await self.ffmpeg.run([
                 "ffmpeg",
                 "-loglevel", "error",
                 "-i", video_path,
-                "-map_metadata", "-1",
+                "-map", "0:v:0",
+                "-map", "0:a:0?",
                 "-c", "copy",
-                f"temp_{video_path}"
+                "-f", "segment",
+                "-segment_time", f"{duration / segments:.3f}",
+                "-reset_timestamps", "1",
+                os.path.join(work_dir, "source_%04d.mkv")
+            ], priority)
+            sources = sorted(
+                name for name in os.listdir(work_dir) if name.startswith("source_")
+            )
+
+            threads = max(1, (os.cpu_count() or 1) // self.ffmpeg.max_jobs)
+            encoded = [
+                [
+                    (os.path.join(work_dir, f"encoded_{copy}_{index:04d}.mp4"), params)
+                    for copy, (_, params) in enumerate(outputs)
+                ]
+                for index in range(len(sources))
             ]
-            subprocess.run(command, check=True)
-            os.replace(f"temp_{video_path}", video_path)
-            console.print(f"Метаданные видео {video_path} удалены.", style="green")
-        except Exception as e:
-            logger.error(f"Ошибка при удалении метаданных видео: {e}")
+            tasks = [
+                asyncio.create_task(self._encode(
+                    os.path.join(work_dir, source), segment_outputs, has_audio,
+                    priority, threads, metadata=False
+                ))
+                for source, segment_outputs in zip(sources, encoded)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+            for copy, output in enumerate(outputs):
+                concat_list = os.path.join(work_dir, f"segments_{copy}.txt")
+                with open(concat_list, "w", encoding="utf-8") as f:
+                    for segment_outputs in encoded:
+                        f.write(f"file '{os.path.abspath(segment_outputs[copy][0])}'\n")
+                await self._remux(
+                    concat_list, [output], priority,
+                    input_args=("-f", "concat", "-safe", "0")
+                )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _reencode_reason(self, info: Optional[Dict]) -> Optional[str]:
+        """
+        Decides whether the video can be remuxed with stream copy.
+
+        Args:
+            info (Optional[Dict]): Probe result for the input video.
+
+        Returns:
+            Optional[str]: Why a full encode is required, or None if stream copy is enough.
+        """
+        if not self.config.uniqueness.video.stream_copy:
+            return "копирование потоков отключено"
+        if not info or not info["video"]:
+            return "не удалось определить параметры видео"
+        if not any(fmt in info["format"].split(",") for fmt in STREAM_COPY_FORMATS):
+            return f"контейнер {info['format']}"
+        video = info["video"]
+        if video.get("codec_name") not in STREAM_COPY_VIDEO_CODECS:
+            return f"видеокодек {video.get('codec_name')}"
+        if video.get("pix_fmt") not in STREAM_COPY_PIXEL_FORMATS:
+            return f"формат пикселей {video.get('pix_fmt')}"
+        audio = info["audio"]
+        if audio and audio.get("codec_name") not in STREAM_COPY_AUDIO_CODECS:
+            return f"аудиокодек {audio.get('codec_name')}"
+        return None
+
+    def _random_params(self) -> Dict:
+        """
+        Draws the random values for one unique copy of a video.
+
+        Returns:
+            Dict: Parameters consumed by the filter and metadata builders.
+        """
+        settings = self.config.uniqueness.video
+        params = {"speed": 1.0}
+
+        low, high = settings.audio_speed
+        if high > 0:
+            change = random.uniform(low, high) / 100
+            params["speed"] = 1 + random.choice([-1, 1]) * change
+        if settings.frame_rate_variation:
+            params["fps"] = random.uniform(29.5, 30.5)
+        if settings.hash_change:
+            params["brightness"] = random.uniform(-0.01, 0.01)
+            params["saturation"] = random.uniform(0.98, 1.02)
+            params["comment"] = self._generate_random_string(16)
+        if settings.watermark:
+            params["box"] = (
+                random.uniform(0.05, 0.85), random.uniform(0.05, 0.85),
+                random.uniform(0.02, 0.1), random.uniform(0.02, 0.1),
+            )
+        if settings.metadata == "replace":
+            params["metadata"] = {
+                "make": self._generate_random_string(10),
+                "model": self._generate_random_string(8),
+                "serial_number": self._generate_random_string(12),
+            }
+        return params
+
+    def _video_filters(self, params: Dict) -> List[str]:
+        filters = []
+        if params["speed"] != 1.0:
+            filters.append(f"setpts=PTS/{params['speed']:.4f}")
+        if "fps" in params:
+            filters.append(f"fps={params['fps']:.3f}")
+        if "brightness" in params:
+            filters.append(
+                f"eq=brightness={params['brightness']:.4f}:saturation={params['saturation']:.4f}"
+            )
+        if "box" in params:
+            x, y, w, h = params["box"]
+            filters.append(
+                f"drawbox=x=iw*{x:.3f}:y=ih*{y:.3f}:w=iw*{w:.3f}:h=ih*{h:.3f}"
+                f":color=white@0.02:t=fill"
+            )
+        filters.append("format=yuv420p")
+        return filters
+
+    def _audio_filters(self, params: Dict) -> List[str]:
+        if params["speed"] == 1.0:
+            return []
+        return [f"atempo={params['speed']:.4f}"]
+
+    def _filter_args(self, params: Dict) -> List[str]:
+        args = ["-vf", ",".join(self._video_filters(params))]
+        audio_filters = self._audio_filters(params)
+        if audio_filters:
+            args += ["-af", ",".join(audio_filters)]
+        return args
+
+    def _encode_args(self) -> List[str]:
+        return [
+            "-c:v", "libx264",
+            "-profile:v", "baseline",
+            "-preset", "fast",
+            "-crf", "23",
+            "-c:a", "aac",
+            "-b:a", "128k",
+        ]
+
+    def _metadata_args(self, params: Dict) -> List[str]:
+        """
+        Builds the metadata and container options for the configured metadata mode.
+        """
+        mode = self.config.uniqueness.video.metadata
+        if mode not in ("replace", "remove"):
+            return ["-movflags", "+faststart"]
+
+        args = ["-map_metadata", "-1", "-map_chapters", "-1"]
+        if mode == "remove":
+            return args + ["-movflags", "+faststart"]
+
+        args += [
+            "-metadata", "artist=UniqueManager",
+            "-metadata", "software=ContentCloner",
+        ]
+        for key, value in params["metadata"].items():
+            args += ["-metadata", f"{key}={value}"]
+        if "comment" in params:
+            args += ["-metadata", f"comment={params['comment']}"]
+        return args + ["-movflags", "+faststart+use_metadata_tags"]
 
     def _generate_random_string(self, length: int = 8) -> str:
         return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
@@ -1,3 +1,5 @@
+import io
+from typing import List, Optional, Union
 from src.managers.unique import (
     TextUniquenessManager, ImageUniquenessManager, VideoUniquenessManager
 )
@@ -27,26 +29,76 @@ class UniqueManager:
         """
         return await self.text_manager.unique_text(text)
 
-    def unique_image(self, image_path: str) -> str:
+    async def unique_text_variants(self, text: str, count: int) -> List[str]:
+        """
+        Produces several unique versions of a text.
+
+        Args:
+            text (str): Input text.
+            count (int): Number of versions.
+
+        Returns:
+            List[str]: Unique texts.
+        """
+        return await self.text_manager.unique_text_variants(text, count)
+
+    async def unique_image(self, image_path: Union[str, bytes]) -> Union[str, io.BytesIO]:
         """
         Applies image uniqueness transformations.
 
         Args:
-            image_path (str): Path to the input image.
+            image_path (Union[str, bytes]): Path to the input image or its contents.
 
         Returns:
-            str: Path to the unique image.
+            Union[str, io.BytesIO]: Path to the unique image, or the image in memory.
         """
-        return self.image_manager.unique_image(image_path)
+        return await self.image_manager.unique_image(image_path)
 
-    def unique_video(self, video_path: str) -> str:
+    async def unique_image_variants(
+        self,
+        image_path: Union[str, bytes],
+        count: int,
+    ) -> List[Union[str, io.BytesIO]]:
+        """
+        Produces several unique versions of an image from a single decode.
+
+        Args:
+            image_path (Union[str, bytes]): Path to the input image or its contents.
+            count (int): Number of versions.
+
+        Returns:
+            List[Union[str, io.BytesIO]]: Paths to the unique images, or the images in memory.
+        """
+        return await self.image_manager.unique_image_variants(image_path, count)
+
+    async def unique_video(self, video_path: str, duration: Optional[float] = None) -> str:
         """
         Applies video uniqueness transformations.
 
         Args:
             video_path (str): Path to the input video.
+            duration (Optional[float]): Video duration in seconds, if known.
 
         Returns:
             str: Path to the unique video.
         """
-        return self.video_manager.unique_video(video_path)
+        return await self.video_manager.unique_video(video_path, duration)
+
+    async def unique_video_variants(
+        self,
+        video_path: str,
+        count: int,
+        duration: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Produces several unique versions of a video from a single decode.
+
+        Args:
+            video_path (str): Path to the input video.
+            count (int): Number of versions.
+            duration (Optional[float]): Video duration in seconds, if known.
+
+        Returns:
+            List[str]: Paths to the unique videos.
+        """
+        return await self.video_manager.unique_video_variants(video_path, count, duration)
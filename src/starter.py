@@ -6,6 +6,7 @@ from typing import Generator
 from tooler import move_item
 from src.thon import BaseSession
 from src.cloner import Cloner
+from src.managers.clone import SourceHub
 from src.logger import logger
 from src.logger import console
 
@@ -18,6 +19,8 @@ class Starter(BaseSession):
     ):
         self.semaphore = Semaphore(threads)
         self.config = config
+        # Один слушатель на каждый источник, общий для всех аккаунтов
+        self.source_hub = SourceHub() if config.cloning.shared_sources else None
         super().__init__()
 
     async def _main(
@@ -28,7 +31,7 @@ class Starter(BaseSession):
         config
     ):
         try:
-            cloner = Cloner(item, json_file, json_data, config)
+            cloner = Cloner(item, json_file, json_data, config, self.source_hub)
             async with self.semaphore:
                 try:
                     r = await cloner.main()
@@ -37,19 +40,30 @@ class Starter(BaseSession):
                     r = "ERROR_UNKNOWN"
             if "ERROR_AUTH" in r:
                 logger.error(f"{item} | Аккаунт забанен или разлогинен")
-                move_item(item, self.banned_dir, True, True)
-                move_item(json_file, self.banned_dir, True, True)
+                await self._move_session(cloner, item, json_file, self.banned_dir)
                 return
             if "ERROR_STORY" in r:
                 logger.error(f"Ошибка при работе акканута {item}")
-                move_item(item, self.errors_dir, True, True)
-                move_item(json_file, self.errors_dir, True, True)
+                await self._move_session(cloner, item, json_file, self.errors_dir)
                 return
             if "OK" in r:
                 console.log(f"{item.name} | Аккаунт закончил работу", style="green")
         except Exception as e:
             logger.error(f"Ошибка при работе акканута {item}: {e}")
 
+    async def _move_session(self, cloner: Cloner, item: Path, json_file: Path, directory: Path) -> None:
+        """
+        Переносит сессию, ее json и кеш сущностей аккаунта (вместе с файлами WAL) в папку.
+        Клиент отключается заранее, чтобы база кеша сущностей была закрыта.
+        """
+        await cloner.disconnect()
+        move_item(item, directory, True, True)
+        move_item(json_file, directory, True, True)
+        entity_file = cloner.entity_file
+        for path in (entity_file, Path(f"{entity_file}-wal"), Path(f"{entity_file}-shm")):
+            if path.exists():
+                move_item(path, directory, True, True)
+
     def __get_sessions_and_users(self) -> Generator:
         for item, json_file, json_data in self.find_sessions():
             yield item, json_file, json_data
@@ -15,6 +15,8 @@ from telethon.network import Connection, ConnectionTcpFull, MTProtoSender, TcpMT
 from telethon.sessions import MemorySession, Session, SQLiteSession
 from telethon.tl import functions, types
 
+from .request_scheduler import RequestScheduler
+
 DEFAULT_DC_ID = 2
 DEFAULT_IPV4_IP = "149.154.167.51"
 DEFAULT_IPV6_IP = "2001:67c:4e8:f002::a"
@@ -114,6 +116,7 @@ class TelegramClient(TC):
             )
 
         self.flood_sleep_threshold = flood_sleep_threshold
+        self.request_scheduler = RequestScheduler()
 
         self.session = session
         self.api_id = int(api_id)
@@ -243,3 +246,13 @@ class TelegramClient(TC):
             updates_queue=self._updates_queue,
             auto_reconnect_callback=self._handle_auto_reconnect,
         )
+
+    async def _call(self, sender, request, ordered=False, flood_sleep_threshold=None):
+        # Every request goes through the per-account scheduler, which handles
+        # FloodWaits per method instead of sleeping inline
+        return await self.request_scheduler.call(
+            lambda: super(TelegramClient, self)._call(
+                sender, request, ordered=ordered, flood_sleep_threshold=0
+            ),
+            request,
+        )
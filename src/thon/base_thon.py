@@ -7,6 +7,7 @@ from telethon.errors import UserDeactivatedBanError, UserDeactivatedError
 from telethon.sessions import StringSession
 
 from .base_client import TelegramClient
+from .entity_session import EntityStoreSession
 
 TelethonBannedError = (UserDeactivatedError, UserDeactivatedBanError)
 
@@ -135,8 +136,17 @@ class BaseThon(BaseData):
     def client(self) -> TelegramClient:
         return self.__client
 
+    @property
+    def entity_file(self) -> Path:
+        """Persistent entity cache of the account, next to its session file"""
+        return self.__item.with_suffix(".entities")
+
     def __get_client(self) -> TelegramClient:
-        __session = str(self.__item) if not self.__item else self.string_session
+        __session = (
+            str(self.__item)
+            if not self.__item
+            else EntityStoreSession(self.string_session.save(), self.entity_file)
+        )
         return TelegramClient(
             session=__session,
             api_id=self.app_id,
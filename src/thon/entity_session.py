@@ -0,0 +1,49 @@
+import sqlite3
+from pathlib import Path
+
+from telethon.sessions import StringSession
+
+
+class EntityStoreSession(StringSession):
+    """
+    StringSession with a persistent per-account entity cache.
+
+    Entities (marked id, access_hash, username, phone, name) are loaded from a
+    SQLite file on start, so usernames and ids seen in earlier runs resolve
+    without ResolveUsername. New or changed entities are written back as the
+    client receives them.
+    """
+
+    def __init__(self, string: str | None, entity_file: Path | str):
+        super().__init__(string)
+        Path(entity_file).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(entity_file))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            "id INTEGER PRIMARY KEY, hash INTEGER NOT NULL, "
+            "username TEXT, phone INTEGER, name TEXT)"
+        )
+        self._db.commit()
+        self._entities = set(
+            self._db.execute("SELECT id, hash, username, phone, name FROM entities")
+        )
+
+    def process_entities(self, tlo):
+        rows = set(self._entities_to_rows(tlo)) - self._entities
+        if not rows:
+            return
+        ids = {row[0] for row in rows}
+        self._entities = {row for row in self._entities if row[0] not in ids} | rows
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error:
+            # Keep the in-memory cache; the store only misses these rows
+            pass
+
+    def close(self):
+        super().close()
+        self._db.close()
@@ -0,0 +1,68 @@
+import time
+import asyncio
+import logging
+
+from telethon import errors, utils
+
+_log = logging.getLogger(__name__)
+
+
+class RequestScheduler:
+    """
+    Per-account FloodWait bookkeeping for every request made by a client.
+
+    A FloodWait penalizes only the method that caused it: the time after which
+    that method is allowed again is remembered, and calls of that method wait
+    for it without blocking anything else. Calls of other methods keep flowing.
+    Waits longer than ``max_wait`` are not slept through: the call fails at once
+    with FloodWaitError, so the caller can skip the work and go on.
+
+    ``on_flood(request, seconds)`` is called for every FloodWait received, also
+    for the ones retried here, so callers can slow down their own pace.
+    """
+
+    def __init__(self, max_wait: int = 300):
+        self.max_wait = max_wait
+        self.on_flood = None
+        self._next_allowed: dict[int, float] = {}
+
+    def remaining(self, request) -> float:
+        """Seconds until the method of ``request`` may be called again"""
+        due = self._next_allowed.get(request.CONSTRUCTOR_ID)
+        if due is None:
+            return 0
+        left = due - time.monotonic()
+        if left <= 0:
+            self._next_allowed.pop(request.CONSTRUCTOR_ID, None)
+            return 0
+        return left
+
+    def penalize(self, request, seconds: int) -> None:
+        """Remembers a FloodWait received for the method of ``request``"""
+        due = time.monotonic() + seconds
+        key = request.CONSTRUCTOR_ID
+        self._next_allowed[key] = max(due, self._next_allowed.get(key, 0))
+        _log.info("FloodWait %s s for %s", seconds, type(request).__name__)
+
+    async def call(self, send, request):
+        """
+        Runs ``send()`` once every method in ``request`` is allowed, retrying
+        after FloodWaits that fit into ``max_wait``.
+        """
+        requests = list(request) if utils.is_list_like(request) else [request]
+        while True:
+            delay = max(self.remaining(r) for r in requests)
+            if delay > self.max_wait:
+                blocked = max(requests, key=self.remaining)
+                raise errors.FloodWaitError(request=blocked, capture=int(delay))
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                return await send()
+            except errors.FloodWaitError as e:
+                blocked = getattr(e, "request", None) or requests[0]
+                self.penalize(blocked, e.seconds)
+                if self.on_flood:
+                    self.on_flood(blocked, e.seconds)
+                if e.seconds > self.max_wait:
+                    raise
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl.functions.messages import CheckChatInviteRequest, ImportChatInviteRequest
+from telethon.tl.types import Channel, ChatInvite, ChatPhotoEmpty, InputPeerChannel
+
+from src.managers import ChatJoiner, JoinStatus
+
+
+class InviteClient:
+    def __init__(self, channel: bool):
+        self.channel = channel
+        self.imported = []
+
+    async def __call__(self, request):
+        if isinstance(request, CheckChatInviteRequest):
+            return ChatInvite(
+                title="chat", photo=None, participants_count=1, color=0,
+                channel=self.channel, megagroup=not self.channel,
+            )
+        if isinstance(request, ImportChatInviteRequest):
+            self.imported.append(request.hash)
+            return None
+        raise AssertionError(request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("link", ["https://t.me/joinchat/AbC123", "https://t.me/+AbC123", "joinchat/AbC123"])
+@pytest.mark.parametrize("channel", [True, False])
+async def test_private_join_uses_resolved_invite_hash(link, channel):
+    joiner = ChatJoiner(SimpleNamespace(timeouts=SimpleNamespace(join_delay=(0, 0))))
+    client = InviteClient(channel)
+
+    assert await joiner.join(client, "+100", link) == JoinStatus.OK
+    assert client.imported == ["AbC123"]
+
+
+class CachedClient:
+    def __init__(self):
+        self.fetched = []
+
+    async def get_input_entity(self, chat):
+        return InputPeerChannel(channel_id=5, access_hash=1)
+
+    async def get_entity(self, peer):
+        self.fetched.append(peer)
+        return Channel(
+            id=5, title="chat", photo=ChatPhotoEmpty(), date=None, left=True,
+            broadcast=True, username="chan", access_hash=1,
+        )
+
+
+@pytest.mark.asyncio
+async def test_resolve_fetches_entity_by_cached_peer():
+    joiner = ChatJoiner(SimpleNamespace())
+    client = CachedClient()
+
+    info = await joiner.resolve_chat(client, "chan")
+
+    assert client.fetched == [InputPeerChannel(channel_id=5, access_hash=1)]
+    assert not info.member and not info.private
+
+
+@pytest.mark.asyncio
+async def test_known_member_by_id_is_not_fetched():
+    joiner = ChatJoiner(SimpleNamespace())
+    joiner._member_ids, joiner._memberships_loaded = {-1000000000005}, True
+    client = CachedClient()
+
+    assert await joiner.join(client, "+100", "renamed_chan") == JoinStatus.ALREADY_JOINED
+    assert client.fetched == []
@@ -0,0 +1,217 @@
+from types import SimpleNamespace
+
+import time
+import asyncio
+
+import pytest
+from telethon.errors import ChannelPrivateError
+
+from src.managers.clone import ContentPublisher, SourceHub
+from src.managers.content_cloner import ContentCloner
+
+
+class FailingUniquifier:
+    async def make_content_variants(self, content, count):
+        raise RuntimeError("ffmpeg failed")
+
+
+def make_cloner(**attrs) -> ContentCloner:
+    cloner = ContentCloner.__new__(ContentCloner)
+    cloner._running = True
+    cloner._claimed = set()
+    cloner.source_hub = None
+    cloner.ledger = None
+    cloner.target_channels = ["@target"]
+    cloner.content_publisher = ContentPublisher(client=None)
+
+    async def check_access(channel):
+        return True
+
+    cloner._check_channel_access = check_access
+    for name, value in attrs.items():
+        setattr(cloner, name, value)
+    return cloner
+
+
+@pytest.mark.asyncio
+async def test_failed_uniquify_releases_claim_and_files(tmp_path):
+    original = tmp_path / "original.mp4"
+    original.write_bytes(b"video")
+    cloner = make_cloner(content_uniquifier=FailingUniquifier())
+    source = (-100, 7)
+    cloner._claimed.add(source)
+    job = {"album": False, "contents": [{"video": str(original)}], "source": source, "pending": ["@target"]}
+
+    with pytest.raises(RuntimeError):
+        await cloner._uniquify_stage(job)
+
+    assert source not in cloner._claimed
+    assert not original.exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_album_extract_releases_claim_and_files(tmp_path):
+    downloaded = tmp_path / "first.jpg"
+
+    class Extractor:
+        async def extract_content(self, message):
+            if message.id == 2:
+                raise ConnectionError("download interrupted")
+            downloaded.write_bytes(b"photo")
+            return {"text": "", "photo": str(downloaded)}
+
+    cloner = make_cloner(content_extractor=Extractor())
+    album = [SimpleNamespace(id=message_id, chat_id=-100) for message_id in (1, 2)]
+
+    with pytest.raises(ConnectionError):
+        await cloner._extract_stage(album)
+
+    assert not cloner._claimed
+    assert not downloaded.exists()
+
+
+class FailingClient:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    async def get_input_entity(self, channel):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error, retried", [
+    (ChannelPrivateError(request=None), False),
+    (ConnectionError("network is unreachable"), True),
+])
+async def test_only_confirmed_denial_is_cached_for_access_ttl(error, retried):
+    client = FailingClient(error)
+    cloner = make_cloner(
+        client=client,
+        _access={},
+        config=SimpleNamespace(cloning=SimpleNamespace(access_ttl=3600)),
+    )
+
+    assert not await ContentCloner._check_channel_access(cloner, "@source")
+    expires = cloner._access["@source"][1] - time.monotonic()
+    assert (expires <= 60) is retried
+    assert not await ContentCloner._check_channel_access(cloner, "@source")
+    assert client.calls == 1
+
+
+class PhotoExtractor:
+    def __init__(self, path):
+        self.path = path
+
+    async def extract_content(self, message):
+        self.path.write_bytes(b"photo")
+        return {"text": "", "photo": str(self.path)}
+
+
+class HandOff:
+    def __init__(self, error=None):
+        self.error = error
+        self.jobs = []
+
+    async def submit(self, job, stage=0):
+        if self.error:
+            raise self.error
+        self.jobs.append(job)
+
+
+def make_shared(tmp_path, hand_off):
+    original = tmp_path / "original.jpg"
+    hub = SourceHub()
+    listener = make_cloner(content_extractor=PhotoExtractor(original), content_uniquifier=FailingUniquifier())
+    consumer = make_cloner(account_phone="+200", pipeline=hand_off)
+    hub._consumers[-100] = [listener, consumer]
+    listener.source_hub = consumer.source_hub = hub
+    return original, listener, consumer
+
+
+@pytest.mark.asyncio
+async def test_failed_consumer_still_releases_shared_original(tmp_path):
+    hand_off = HandOff()
+    original, listener, consumer = make_shared(tmp_path, hand_off)
+
+    job = await listener._extract_stage(SimpleNamespace(id=7, chat_id=-100))
+    with pytest.raises(RuntimeError):
+        await listener._uniquify_stage(job)
+    listener._drop_job(job)
+
+    assert original.exists()
+    consumer._drop_job(hand_off.jobs[0])
+    assert not original.exists()
+    assert not listener._claimed and not consumer._claimed
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hand_off_releases_every_claim(tmp_path):
+    original, listener, consumer = make_shared(tmp_path, HandOff(asyncio.CancelledError()))
+
+    with pytest.raises(asyncio.CancelledError):
+        await listener._extract_stage(SimpleNamespace(id=7, chat_id=-100))
+
+    assert not original.exists()
+    assert not listener._claimed and not consumer._claimed
+
+
+@pytest.mark.asyncio
+async def test_failed_album_variant_removes_finished_variants(tmp_path):
+    originals = [tmp_path / "first.jpg", tmp_path / "second.mp4"]
+    for original in originals:
+        original.write_bytes(b"media")
+    variant = tmp_path / "unique_first.jpg"
+
+    class Uniquifier:
+        async def make_content_variants(self, content, count):
+            if "video" in content:
+                raise RuntimeError("ffmpeg failed")
+            variant.write_bytes(b"unique")
+            return [{"photo": str(variant)}] * count
+
+    cloner = make_cloner(content_uniquifier=Uniquifier())
+    job = {
+        "album": True,
+        "contents": [{"photo": str(originals[0])}, {"video": str(originals[1])}],
+        "source": (-100, 7),
+        "pending": ["@target"],
+    }
+
+    with pytest.raises(RuntimeError):
+        await cloner._uniquify_stage(job)
+
+    assert not variant.exists()
+    assert not any(original.exists() for original in originals)
+
+
+@pytest.mark.asyncio
+async def test_warm_access_uses_session_cache_with_bounded_concurrency():
+    class CachedClient:
+        def __init__(self):
+            self.active = self.peak = 0
+            self.resolved = []
+
+        async def get_input_entity(self, channel):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            self.resolved.append(channel)
+            return SimpleNamespace(channel_id=len(self.resolved))
+
+    client = CachedClient()
+    cloner = make_cloner(
+        client=client,
+        _access={},
+        config=SimpleNamespace(cloning=SimpleNamespace(access_ttl=3600)),
+        source_channels=[f"@source{index}" for index in range(8)],
+        target_channels=["@target", "@source0"],
+    )
+    del cloner._check_channel_access
+
+    await cloner._warm_access()
+
+    assert sorted(client.resolved) == sorted({f"@source{index}" for index in range(8)} | {"@target"})
+    assert client.peak <= 3
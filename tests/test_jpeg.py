@@ -0,0 +1,104 @@
+import io
+
+import piexif
+import pytest
+from PIL import Image, ImageChops, ImageFilter
+
+from src.managers.unique.image import _unique_jpeg_lossless
+from src.managers.unique.jpeg import (
+    JpegFormatError, is_sequential_jpeg, lossless_unique_jpeg, parse_segments
+)
+
+WIDTH, HEIGHT = 70, 50
+
+
+def make_jpeg(subsampling: int = 2, progressive: bool = False) -> bytes:
+    noise = Image.effect_noise((WIDTH, HEIGHT), 60).filter(ImageFilter.GaussianBlur(2))
+    gradient = Image.linear_gradient("L").resize((WIDTH, HEIGHT))
+    image = Image.merge("RGB", (noise, gradient, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = io.BytesIO()
+    exif = piexif.dump({"0th": {piexif.ImageIFD.Make: b"Original"}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None})
+    image.save(buffer, "jpeg", quality=90, subsampling=subsampling, progressive=progressive, exif=exif)
+    return buffer.getvalue()
+
+
+def decode(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
+
+@pytest.mark.parametrize("subsampling", [0, 2])
+@pytest.mark.parametrize("crop", [3, 10])
+def test_round_trip_keeps_pixels_inside_crop(subsampling, crop):
+    data = make_jpeg(subsampling)
+
+    unique = decode(lossless_unique_jpeg(data, crop))
+    original = decode(data).crop((0, 0) + unique.size)
+
+    assert unique.size[0] < WIDTH
+    assert ImageChops.difference(unique, original).getbbox() is None
+
+
+@pytest.mark.parametrize(
+    "subsampling, crop, size",
+    [
+        # 4:2:0, 16x16 MCUs: 70x50 keeps its block layout down to 65x49
+        (2, 3, (67, 49)),
+        (2, 10, (65, 49)),
+        # 4:4:4, 8x8 MCUs: same limits, each plane has one block per MCU
+        (0, 4, (66, 49)),
+    ],
+)
+def test_size_after_crop_not_multiple_of_8(subsampling, crop, size):
+    unique = decode(lossless_unique_jpeg(make_jpeg(subsampling), crop))
+
+    assert unique.size == size
+
+
+def test_zero_crop_keeps_size_but_changes_bytes():
+    data = make_jpeg()
+
+    unique = lossless_unique_jpeg(data, 0)
+
+    assert decode(unique).size == (WIDTH, HEIGHT)
+    assert unique != data
+
+
+def test_metadata_is_replaced():
+    exif = piexif.dump({"0th": {piexif.ImageIFD.Make: b"Canon"}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None})
+
+    unique = lossless_unique_jpeg(make_jpeg(), 2, exif)
+
+    make = piexif.load(unique)["0th"][piexif.ImageIFD.Make]
+    assert make == b"Canon"
+    assert b"Original" not in unique
+
+
+def test_metadata_is_removed_without_new_exif():
+    unique = lossless_unique_jpeg(make_jpeg(), 2)
+
+    assert b"Original" not in unique
+    assert b"Exif" not in unique
+
+
+def test_progressive_jpeg_is_rejected():
+    data = make_jpeg(progressive=True)
+
+    assert is_sequential_jpeg(make_jpeg())
+    assert not is_sequential_jpeg(data)
+    with pytest.raises(JpegFormatError):
+        lossless_unique_jpeg(data, 2)
+
+
+def test_progressive_jpeg_falls_back_to_pixel_path():
+    params = {"metadata_mode": "remove", "crop": 2}
+
+    assert _unique_jpeg_lossless(make_jpeg(progressive=True), [("unused.jpg", params)]) is None
+
+
+def test_non_jpeg_is_rejected():
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, "png")
+
+    assert not is_sequential_jpeg(buffer.getvalue())
+    with pytest.raises(JpegFormatError):
+        parse_segments(buffer.getvalue())
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.managers.clone import PublishLedger, TokenBucket
+from src.managers.content_cloner import ContentCloner
+
+
+class FakePublisher:
+    async def publish_album(self, album_contents, channel, schedule=None):
+        return [SimpleNamespace(id=500 + index) for index in range(len(album_contents))]
+
+
+def test_resume_point_stops_at_partially_published_post(tmp_path):
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    for message_id in (10, 11, 13):
+        ledger.record(-100, message_id, "@a")
+        ledger.record(-100, message_id, "@b")
+    ledger.record(-100, 12, "@a")
+    ledger.record(-100, 14, "@a")
+
+    assert ledger.resume_point(-100, ["@a", "@b"]) == 11
+    assert ledger.resume_point(-100, ["@a"]) == 14
+    assert ledger.resume_point(-100, ["@b"]) == 13
+    assert ledger.resume_point(-200, ["@a", "@b"]) is None
+
+
+def test_resume_point_ignores_other_targets(tmp_path):
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    for message_id in range(101, 106):
+        ledger.record(-100, message_id, "@b")
+    for message_id in (104, 105):
+        ledger.record(-100, message_id, "@a")
+
+    assert ledger.resume_point(-100, ["@a"]) == 105
+    assert ledger.resume_point(-100, ["@b"]) == 105
+    assert ledger.resume_point(-100, ["@a", "@b"]) == 100
+    assert ledger.resume_point(-100, ["@c"]) is None
+
+
+@pytest.mark.asyncio
+async def test_resume_point_survives_restart(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    ledger = PublishLedger(path)
+    ledger.record(-100, 10, "@a", 1)
+    await ledger.flush()
+
+    assert PublishLedger(path).resume_point(-100, ["@a"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_album_records_every_message(tmp_path):
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    cloner = ContentCloner.__new__(ContentCloner)
+    cloner.ledger = ledger
+    cloner.calendars = {}
+    cloner.rate_controller = None
+    cloner.rate_limiters = {"@a": TokenBucket(1000, 10)}
+    cloner.content_publisher = FakePublisher()
+    job = {"album": True, "source": (-100, 20), "ids": [20, 21, 22]}
+
+    await cloner._publish_to_target("@a", [{"photo": "1.jpg"}, {"photo": "2.jpg"}, {"photo": "3.jpg"}], job)
+
+    assert ledger.pending_targets(-100, 21, ["@a"]) == []
+    assert ledger.pending_targets(-100, 22, ["@a"]) == []
+    assert ledger.resume_point(-100, ["@a"]) == 22
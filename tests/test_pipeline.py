@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.managers.clone.pipeline import ClonePipeline
+
+
+def make_settings(workers: int = 4) -> SimpleNamespace:
+    return SimpleNamespace(
+        extract_workers=workers,
+        uniquify_workers=workers,
+        publish_workers=1,
+        queue_size=8,
+    )
+
+
+@pytest.mark.asyncio
+async def test_publish_order_matches_submit_order():
+    published = []
+
+    async def extract(job):
+        # Later jobs finish extraction first
+        await asyncio.sleep(0.01 * (5 - job))
+        return job
+
+    async def uniquify(job):
+        await asyncio.sleep(0.005 * (job % 3))
+        return job
+
+    async def publish(job):
+        published.append(job)
+
+    pipeline = ClonePipeline(extract, uniquify, publish, make_settings())
+    pipeline.start()
+    for job in range(6):
+        await pipeline.submit(job)
+    await pipeline.join()
+    await pipeline.stop()
+
+    assert published == [0, 1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_skipped_and_failed_jobs_do_not_block_order():
+    published = []
+
+    async def extract(job):
+        await asyncio.sleep(0.01 * (5 - job))
+        if job == 1:
+            raise RuntimeError("download failed")
+        return job
+
+    async def uniquify(job):
+        if job == 3:
+            return None
+        if job == 4:
+            raise RuntimeError("ffmpeg failed")
+        return job
+
+    async def publish(job):
+        published.append(job)
+
+    pipeline = ClonePipeline(extract, uniquify, publish, make_settings())
+    pipeline.start()
+    for job in range(6):
+        await pipeline.submit(job)
+    await asyncio.wait_for(pipeline.join(), 5)
+    await pipeline.stop()
+
+    assert published == [0, 2, 5]
+
+
+@pytest.mark.asyncio
+async def test_jobs_submitted_to_uniquify_stage_keep_order():
+    published = []
+
+    async def extract(job):
+        await asyncio.sleep(0.02)
+        return job
+
+    async def uniquify(job):
+        return job
+
+    async def publish(job):
+        published.append(job)
+
+    pipeline = ClonePipeline(extract, uniquify, publish, make_settings())
+    pipeline.start()
+    await pipeline.submit("extracted")
+    await pipeline.submit("shared", stage=1)
+    await pipeline.join()
+    await pipeline.stop()
+
+    assert published == ["extracted", "shared"]
+
+
+@pytest.mark.asyncio
+async def test_stop_discards_extracted_jobs_that_were_not_published():
+    discarded = []
+    blocked = asyncio.Event()
+
+    async def extract(job):
+        return job
+
+    async def uniquify(job):
+        if job == "waiting":
+            await asyncio.sleep(0.05)
+        return job
+
+    async def publish(job):
+        blocked.set()
+        await asyncio.Event().wait()
+
+    pipeline = ClonePipeline(extract, uniquify, publish, make_settings(), discard=discarded.append)
+    pipeline.start()
+    await pipeline.submit("publishing")
+    await blocked.wait()
+    await pipeline.submit("waiting", stage=1)
+    await pipeline.submit("queued", stage=1)
+    await asyncio.sleep(0.01)
+    await pipeline.stop()
+
+    assert sorted(discarded) == ["queued"]
+    with pytest.raises(RuntimeError):
+        await pipeline.submit("late", stage=1)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl.types import (
+    InputMediaUploadedPhoto, MessageMediaPhoto, Photo, PhotoSize
+)
+
+from src.managers.clone import ContentExtractor, ContentPublisher, ContentUniquifier
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00\xff\xd9"
+
+
+class FakeClient:
+    def __init__(self):
+        self.uploads = []
+        self.sent = []
+
+    async def upload_file(self, file, file_name=None):
+        self.uploads.append(file_name)
+        return SimpleNamespace(name=file_name)
+
+    async def send_file(self, channel, media, **kwargs):
+        self.sent.append((channel, media, kwargs))
+        return SimpleNamespace(id=len(self.sent))
+
+
+class FakeMessage:
+    """A photo message from a channel with forwarding disabled."""
+
+    def __init__(self):
+        self.text = "caption"
+        self.noforwards = True
+        photo = Photo(
+            id=1, access_hash=2, file_reference=b"", date=None, dc_id=2,
+            sizes=[PhotoSize(type="y", w=10, h=10, size=len(JPEG))],
+        )
+        self.media = MessageMediaPhoto(photo=photo)
+
+    async def download_media(self, file=None):
+        assert file is bytes
+        return JPEG
+
+
+def make_uniquifier(image_enabled: bool) -> ContentUniquifier:
+    config = SimpleNamespace(
+        ffmpeg=SimpleNamespace(max_jobs=1, timeout=10),
+        uniqueness=SimpleNamespace(
+            image=SimpleNamespace(enabled=image_enabled),
+            video=SimpleNamespace(enabled=True),
+        ),
+    )
+
+    class UniqueManager:
+        async def unique_text_variants(self, text, count):
+            return [text] * count
+
+    manager = UniqueManager()
+    manager.config = config
+    return ContentUniquifier(manager)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_photo_without_uniqueness_is_published():
+    extractor = ContentExtractor(memory_photo_limit=5, photo_by_reference=True)
+    content = await extractor.extract_content(FakeMessage())
+    assert content["photo"] == JPEG
+
+    variants = await make_uniquifier(image_enabled=False).make_content_variants(content, 2)
+    client = FakeClient()
+    publisher = ContentPublisher(client)
+
+    results = [await publisher.publish_content(variant, f"@target{i}") for i, variant in enumerate(variants)]
+
+    assert all(results)
+    assert [channel for channel, _, _ in client.sent] == ["@target0", "@target1"]
+    assert all(isinstance(media, InputMediaUploadedPhoto) for _, media, _ in client.sent)
+    # Same bytes go to both channels, so the photo is uploaded once
+    assert client.uploads == ["photo.jpg"]
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl.types import Channel, ChatPhotoEmpty, InputPeerChannel
+
+from src.managers.clone import SourceHub
+
+
+class SessionClient:
+    def __init__(self, left):
+        self.left = left
+        self.fetched = []
+
+    async def get_input_entity(self, channel):
+        return InputPeerChannel(channel_id=int(channel.removeprefix("@source")), access_hash=1)
+
+    async def get_entity(self, peers):
+        self.fetched.append(peers)
+        return [
+            Channel(
+                id=peer.channel_id, title="source", photo=ChatPhotoEmpty(), date=None,
+                left=peer.channel_id in self.left, broadcast=True, access_hash=1,
+            )
+            for peer in peers
+        ]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_fetches_all_sources_in_one_request():
+    hub = SourceHub()
+    client = SessionClient(left={2})
+    cloner = SimpleNamespace(account_phone="+100", client=client, source_channels=["@source1", "@source2"])
+
+    await hub.subscribe(cloner)
+
+    assert len(client.fetched) == 1
+    assert all(isinstance(peer, InputPeerChannel) for peer in client.fetched[0])
+    assert hub.consumers(-1000000000001) == [cloner]
+    assert hub.consumers(-1000000000002) == []
@@ -0,0 +1,72 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.managers.unique.ffmpeg import FFmpegError
+from src.managers.unique.video import VideoUniquenessManager
+
+
+class FailingFFmpeg:
+    """Writes every output of the command, then fails like a timed out job."""
+
+    max_jobs = 2
+
+    def __init__(self):
+        self.written = []
+
+    async def run(self, command, priority=0.0, timeout=None):
+        for arg in command:
+            if arg.endswith(".mp4") and arg not in self.written and os.path.basename(arg).startswith(("converted_", "encoded_")):
+                with open(arg, "wb") as f:
+                    f.write(b"partial")
+                self.written.append(arg)
+        if any(arg.endswith(".mkv") for arg in command):
+            directory = os.path.dirname(command[-1])
+            with open(os.path.join(directory, "source_0000.mkv"), "wb") as f:
+                f.write(b"segment")
+            with open(os.path.join(directory, "source_0001.mkv"), "wb") as f:
+                f.write(b"segment")
+            return
+        raise FFmpegError(command, "ffmpeg timed out")
+
+
+class Prober:
+    def __init__(self, info):
+        self.info = info
+
+    async def probe(self, path):
+        return self.info
+
+
+def make_manager(info, segment_threshold=0):
+    manager = VideoUniquenessManager.__new__(VideoUniquenessManager)
+    manager.config = SimpleNamespace(uniqueness=SimpleNamespace(video=SimpleNamespace(
+        stream_copy=True, segment_threshold=segment_threshold, audio_speed=(0, 0),
+        frame_rate_variation=False, hash_change=False, watermark=False, metadata="remove",
+    )))
+    manager.ffmpeg = FailingFFmpeg()
+    manager.prober = Prober(info)
+    return manager
+
+
+H264 = {
+    "format": "mov,mp4", "duration": 10.0,
+    "video": {"codec_name": "h264", "pix_fmt": "yuv420p"}, "audio": {"codec_name": "aac"},
+}
+VP9 = dict(H264, format="matroska,webm", duration=100.0, video={"codec_name": "vp9", "pix_fmt": "yuv420p"})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("info, segment_threshold", [(H264, 0), (VP9, 0), (VP9, 30)])
+async def test_failed_ffmpeg_removes_partial_outputs(tmp_path, monkeypatch, info, segment_threshold):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"video")
+    manager = make_manager(info, segment_threshold)
+
+    assert await manager.unique_video_variants(str(source), 2) == [str(source)] * 2
+
+    assert manager.ffmpeg.written
+    assert not [path for path in manager.ffmpeg.written if os.path.exists(path)]
+    assert source.exists()